@@ -0,0 +1,20 @@
+#!/usr/bin/env python3
+"""
+Audio Sample Format for AI Service
+The pipeline keeps mono float32 audio from TTS output through pitch, mix, enhancement and write
+"""
+
+import numpy as np
+
+AUDIO_DTYPE = np.float32
+
+
+def expect_float32(audio: np.ndarray, stage: str) -> np.ndarray:
+    """Check ``audio`` at a stage boundary and return it unchanged.
+
+    Producers convert once where audio enters the pipeline; a float64 array here
+    means some stage silently upcast and doubled the memory of everything after it.
+    """
+    if audio.dtype != AUDIO_DTYPE:
+        raise TypeError(f"{stage}: expected float32 audio, got {audio.dtype}")
+    return audio
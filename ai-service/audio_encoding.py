@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Audio Encoding for AI Service
+Opus/MP3 renditions of generated WAV files, encoded on a worker pool with ffmpeg
+"""
+
+import os
+import time
+import shutil
+import asyncio
+import logging
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# format -> (file extension, media type, ffmpeg codec arguments)
+FORMATS = {
+    "wav": ("wav", "audio/wav", None),
+    "opus": ("opus", "audio/ogg", ["-c:a", "libopus", "-application", "audio", "-vbr", "on"]),
+    "mp3": ("mp3", "audio/mpeg", ["-c:a", "libmp3lame"]),
+}
+
+# Bitrate presets per format; speech stays transparent at the standard presets
+BITRATE_PRESETS = {
+    "opus": {"low": "32k", "standard": "64k", "high": "96k"},
+    "mp3": {"low": "64k", "standard": "128k", "high": "192k"},
+}
+
+# Accept header media types -> format
+MEDIA_TYPE_FORMATS = {
+    "audio/wav": "wav", "audio/wave": "wav", "audio/x-wav": "wav",
+    "audio/ogg": "opus", "audio/opus": "opus",
+    "audio/mpeg": "mp3", "audio/mp3": "mp3",
+}
+
+
+def validate_format(output_format: str, preset: str = "standard"):
+    if output_format not in FORMATS:
+        raise ValueError(f"Unsupported output format: {output_format} (expected one of {', '.join(FORMATS)})")
+    if output_format != "wav" and preset not in BITRATE_PRESETS[output_format]:
+        raise ValueError(f"Unknown bitrate preset: {preset} (expected one of {', '.join(BITRATE_PRESETS[output_format])})")
+
+
+def media_type_for(path: str) -> str:
+    extension = os.path.splitext(path)[1].lstrip(".")
+    for file_extension, media_type, _ in FORMATS.values():
+        if file_extension == extension:
+            return media_type
+    return "application/octet-stream"
+
+
+def negotiate_format(accept: Optional[str], available: Iterable[str] = ("wav",)) -> str:
+    """Pick a format from an Accept header among ``available`` (WAV when nothing matches).
+
+    The WAV master wins whenever the client lists it: browsers' <audio> requests
+    accept both WAV and Ogg, and serving the master costs no encode.
+    """
+    available = set(available)
+    candidates: List[Tuple[float, int, str]] = []
+    for position, part in enumerate((accept or "").split(",")):
+        fields = [field.strip() for field in part.split(";")]
+        quality = 1.0
+        for field in fields[1:]:
+            if field.startswith("q="):
+                try:
+                    quality = float(field[2:])
+                except ValueError:
+                    quality = 0.0
+        output_format = MEDIA_TYPE_FORMATS.get(fields[0].lower())
+        if output_format in available and quality > 0:
+            if output_format == "wav":
+                return "wav"
+            candidates.append((-quality, position, output_format))
+    return min(candidates)[2] if candidates else "wav"
+
+
+class AudioEncoder:
+    """Encode WAV masters into compressed renditions stored next to them.
+
+    ``schedule`` starts an encode in the background and returns immediately, so
+    callers overlap encoding with the rest of their pipeline; ``encode`` waits
+    for the rendition. Concurrent requests for the same rendition share one
+    ffmpeg run.
+    """
+
+    def __init__(self, max_workers: int = 2, ffmpeg_path: Optional[str] = None):
+        self.ffmpeg_path = ffmpeg_path or shutil.which("ffmpeg")
+        self.max_workers = max_workers
+        self.encodes_completed = 0
+        self.encodes_failed = 0
+        self.total_encode_time = 0.0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="audio-encoder")
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
+    @property
+    def available(self) -> bool:
+        return self.ffmpeg_path is not None
+
+    @property
+    def formats(self) -> Tuple[str, ...]:
+        """Formats this encoder can serve: only the WAV master without ffmpeg"""
+        return tuple(FORMATS) if self.available else ("wav",)
+
+    @staticmethod
+    def rendition_path(wav_path: str, output_format: str, preset: str = "standard") -> str:
+        if output_format == "wav":
+            return wav_path
+        extension = FORMATS[output_format][0]
+        return f"{os.path.splitext(wav_path)[0]}.{preset}.{extension}"
+
+    def _encode(self, wav_path: str, output_path: str, output_format: str, preset: str):
+        """Run ffmpeg (blocking); the rendition appears atomically when complete"""
+        extension, _, codec_args = FORMATS[output_format]
+        temp_path = f"{output_path}.tmp.{extension}"
+        command = [
+            self.ffmpeg_path, "-v", "error", "-y", "-i", wav_path,
+            *codec_args, "-b:a", BITRATE_PRESETS[output_format][preset],
+            temp_path
+        ]
+
+        start_time = time.time()
+        try:
+            subprocess.run(command, check=True, capture_output=True)
+            os.replace(temp_path, output_path)
+        except subprocess.CalledProcessError as e:
+            self.encodes_failed += 1
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise RuntimeError(f"ffmpeg failed: {e.stderr.decode(errors='replace').strip()}")
+
+        self.encodes_completed += 1
+        self.total_encode_time += time.time() - start_time
+        self.bytes_in += os.path.getsize(wav_path)
+        self.bytes_out += os.path.getsize(output_path)
+        logger.info(f"Encoded {output_path} in {time.time() - start_time:.2f}s")
+
+    def schedule(self, wav_path: str, output_format: str, preset: str = "standard") -> asyncio.Future:
+        """Start (or join) the encode of a rendition; returns a future for its path"""
+        validate_format(output_format, preset)
+        output_path = self.rendition_path(wav_path, output_format, preset)
+
+        future = self._in_flight.get(output_path)
+        if future is not None:
+            return future
+
+        loop = asyncio.get_event_loop()
+        if output_format == "wav" or os.path.exists(output_path):
+            future = loop.create_future()
+            future.set_result(output_path)
+            return future
+        if not self.available:
+            raise RuntimeError("ffmpeg is not installed; only WAV output is available")
+
+        async def run():
+            try:
+                await loop.run_in_executor(self._executor, self._encode, wav_path, output_path, output_format, preset)
+                return output_path
+            except Exception as e:
+                logger.error(f"Encoding {output_path} failed: {e}")
+                raise
+            finally:
+                self._in_flight.pop(output_path, None)
+
+        future = asyncio.ensure_future(run())
+        # Background encodes may never be awaited; mark their errors as retrieved (they are logged above)
+        future.add_done_callback(lambda done: done.cancelled() or done.exception())
+        self._in_flight[output_path] = future
+        return future
+
+    async def encode(self, wav_path: str, output_format: str, preset: str = "standard") -> str:
+        # Shield so a cancelled request does not cancel an encode others may be waiting on
+        return await asyncio.shield(self.schedule(wav_path, output_format, preset))
+
+    def stats(self) -> Dict[str, object]:
+        completed = self.encodes_completed
+        return {
+            "ffmpeg_available": self.available,
+            "workers": self.max_workers,
+            "in_flight": len(self._in_flight),
+            "encodes_completed": completed,
+            "encodes_failed": self.encodes_failed,
+            "avg_encode_time": self.total_encode_time / completed if completed else 0,
+            "compression_ratio": self.bytes_in / self.bytes_out if self.bytes_out else 0
+        }
@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+Audio Streaming Helpers for AI Service
+Encode audio chunks for chunked HTTP and WebSocket delivery
+"""
+
+import struct
+import numpy as np
+
+# Placeholder RIFF/data sizes for a stream whose final length is not known yet
+_UNKNOWN_SIZE = 0xFFFFFFFF
+
+
+def wav_stream_header(sample_rate: int, channels: int = 1, bits_per_sample: int = 16) -> bytes:
+    """WAV header for a PCM stream of unknown length (players read until EOF)"""
+    byte_rate = sample_rate * channels * bits_per_sample // 8
+    block_align = channels * bits_per_sample // 8
+    return (
+        b"RIFF" + struct.pack("<I", _UNKNOWN_SIZE) + b"WAVE"
+        + b"fmt " + struct.pack("<IHHIIHH", 16, 1, channels, sample_rate, byte_rate, block_align, bits_per_sample)
+        + b"data" + struct.pack("<I", _UNKNOWN_SIZE)
+    )
+
+
+def pcm16_bytes(audio: np.ndarray) -> bytes:
+    """Convert float audio in [-1, 1] to little-endian 16-bit PCM bytes"""
+    clipped = np.clip(audio, -1.0, 1.0)
+    return (clipped * 32767.0).astype("<i2").tobytes()
+
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+AI Service Benchmarks
+Speed and quality comparisons for the optional inference and audio processing paths
+"""
+
+import os
+import sys
+import time
+import argparse
+import resource
+import tempfile
+import multiprocessing as mp
+
+import numpy as np
+import torch
+
+from pitch_shift import BACKENDS, PitchShifter
+from resampling import Resampler
+from tts_engine import DEFAULT_TTS_MODEL, get_tts_model, run_tts
+
+BENCHMARK_SENTENCES = [
+    "Welcome back to the show, where we dig into the stories behind the headlines.",
+    "Today we are talking about how small teams ship reliable software without burning out.",
+    "Our guest has spent a decade building developer tools used by millions of people.",
+    "Let's start with the question everyone keeps asking: where do you even begin?",
+]
+
+
+def mel_spectrogram(audio: np.ndarray, sample_rate: int) -> np.ndarray:
+    import librosa
+    mel = librosa.feature.melspectrogram(y=audio, sr=sample_rate, n_fft=1024, hop_length=256, n_mels=80)
+    return librosa.power_to_db(mel, ref=np.max)
+
+
+def mel_distance(reference: np.ndarray, candidate: np.ndarray, sample_rate: int) -> float:
+    """Mean absolute log-mel difference in dB over the overlapping frames"""
+    ref_mel = mel_spectrogram(reference, sample_rate)
+    cand_mel = mel_spectrogram(candidate, sample_rate)
+    frames = min(ref_mel.shape[1], cand_mel.shape[1])
+    return float(np.mean(np.abs(ref_mel[:, :frames] - cand_mel[:, :frames])))
+
+
+def time_synthesis(model, fast_cpu: bool, repeats: int):
+    """Return (outputs of the last run, seconds per pass, real-time factor)"""
+    sample_rate = model.synthesizer.output_sample_rate
+    run_tts(model, BENCHMARK_SENTENCES[0], fast_cpu=fast_cpu)  # warm-up
+
+    start_time = time.time()
+    for _ in range(repeats):
+        outputs = [run_tts(model, sentence, fast_cpu=fast_cpu) for sentence in BENCHMARK_SENTENCES]
+    elapsed = (time.time() - start_time) / repeats
+
+    audio_seconds = sum(len(audio) for audio in outputs) / sample_rate
+    return outputs, elapsed, elapsed / audio_seconds
+
+
+def benchmark_cpu_mode(args) -> int:
+    print("⚡ Coqui TTS: default vs fast CPU mode")
+    print("=" * 40)
+
+    torch.set_num_threads(args.threads)
+    torch.set_num_interop_threads(args.interop_threads)
+    print(f"Model: {args.model} | threads: {args.threads} intra-op, {args.interop_threads} inter-op")
+
+    default_model = get_tts_model(args.model)
+    fast_model = get_tts_model(args.model, fast_cpu=True)
+    sample_rate = default_model.synthesizer.output_sample_rate
+
+    default_outputs, default_time, default_rtf = time_synthesis(default_model, False, args.repeats)
+    fast_outputs, fast_time, fast_rtf = time_synthesis(fast_model, True, args.repeats)
+
+    print(f"\n📊 Speed ({len(BENCHMARK_SENTENCES)} sentences, {args.repeats} passes)")
+    print(f"   default:  {default_time:.2f}s per pass, RTF {default_rtf:.3f}")
+    print(f"   fast-cpu: {fast_time:.2f}s per pass, RTF {fast_rtf:.3f}")
+    print(f"   speedup:  {default_time / fast_time:.2f}x")
+
+    print("\n🎧 Quality (log-mel distance to default output, dB; lower is closer)")
+    distances = []
+    for sentence, reference, candidate in zip(BENCHMARK_SENTENCES, default_outputs, fast_outputs):
+        distance = mel_distance(reference, candidate, sample_rate)
+        length_change = (len(candidate) - len(reference)) / len(reference) * 100
+        distances.append(distance)
+        print(f"   {distance:5.2f} dB  ({length_change:+.1f}% length)  {sentence[:50]}...")
+    print(f"   mean: {np.mean(distances):.2f} dB")
+
+    if args.save:
+        import soundfile as sf
+        for i, (reference, candidate) in enumerate(zip(default_outputs, fast_outputs)):
+            sf.write(f"benchmark_default_{i}.wav", reference, sample_rate)
+            sf.write(f"benchmark_fast_cpu_{i}.wav", candidate, sample_rate)
+        print("\n💾 Saved benchmark_default_*.wav and benchmark_fast_cpu_*.wav for listening tests")
+
+    return 0
+
+
+def load_or_synthesize_speech(path: str, model_name: str):
+    """Speech to process: a WAV file if given, otherwise the benchmark sentences rendered once"""
+    if path:
+        import soundfile as sf
+        audio, sample_rate = sf.read(path, dtype="float32")
+        return audio if audio.ndim == 1 else audio.mean(axis=1), sample_rate
+
+    model = get_tts_model(model_name)
+    audio = np.concatenate([run_tts(model, sentence) for sentence in BENCHMARK_SENTENCES])
+    return audio, model.synthesizer.output_sample_rate
+
+
+def benchmark_pitch_shift(args) -> int:
+    print("🎚️  Pitch shift backends")
+    print("=" * 40)
+
+    audio, sample_rate = load_or_synthesize_speech(args.input, args.model)
+    audio_seconds = len(audio) / sample_rate
+    print(f"Input: {audio_seconds:.1f}s of speech at {sample_rate} Hz, shift {args.semitones:+.1f} semitones")
+
+    shifter = PitchShifter()
+    outputs = {}
+    cpu_per_second = {}
+    for backend in BACKENDS:
+        shifter.shift(audio[:sample_rate], sample_rate, args.semitones, backend=backend)  # warm-up
+
+        # Process time counts CPU spent in every thread, not wall clock
+        start_cpu = time.process_time()
+        for _ in range(args.repeats):
+            outputs[backend] = shifter.shift(audio, sample_rate, args.semitones, backend=backend)
+        cpu_per_second[backend] = (time.process_time() - start_cpu) / args.repeats / audio_seconds
+
+    print(f"\n📊 CPU time per audio second ({args.repeats} passes)")
+    for backend in BACKENDS:
+        speedup = cpu_per_second["librosa"] / cpu_per_second[backend]
+        print(f"   {backend:<10} {cpu_per_second[backend] * 1000:7.2f} ms  ({speedup:.1f}x vs librosa)")
+
+    distance = mel_distance(outputs["librosa"], outputs["pedalboard"], sample_rate)
+    print(f"\n🎧 Log-mel distance pedalboard vs librosa: {distance:.2f} dB")
+
+    if args.save:
+        import soundfile as sf
+        for backend, shifted in outputs.items():
+            sf.write(f"benchmark_pitch_{backend}.wav", shifted, sample_rate)
+        print("\n💾 Saved benchmark_pitch_*.wav for listening tests")
+
+    return 0
+
+
+def benchmark_resample(args) -> int:
+    import librosa
+
+    print("🔁 Resampling: librosa.resample vs pooled soxr streams")
+    print("=" * 40)
+
+    pairs = [(22050, 44100), (24000, 22050), (44100, 22050), (48000, 24000)]
+    resampler = Resampler(quality=args.quality)
+    rng = np.random.default_rng(0)
+
+    for src_rate, dst_rate in pairs:
+        # Noise plus a tone: broadband enough to exercise the filter
+        t = np.arange(int(args.seconds * src_rate)) / src_rate
+        audio = (0.3 * np.sin(2 * np.pi * 440 * t) + 0.05 * rng.standard_normal(len(t))).astype(np.float32)
+
+        timings = {}
+        start = time.perf_counter()
+        for _ in range(args.repeats):
+            reference = librosa.resample(audio, orig_sr=src_rate, target_sr=dst_rate)
+        timings["librosa"] = (time.perf_counter() - start) / args.repeats
+
+        resampler.resample(audio[:src_rate], src_rate, dst_rate)  # builds and pools the stream
+        start = time.perf_counter()
+        for _ in range(args.repeats):
+            output = resampler.resample(audio, src_rate, dst_rate)
+        timings["soxr pooled"] = (time.perf_counter() - start) / args.repeats
+
+        frames = min(len(reference), len(output))
+        error_db = 20 * np.log10(np.sqrt(np.mean((reference[:frames] - output[:frames]) ** 2)) + 1e-12)
+
+        print(f"\n📊 {src_rate} -> {dst_rate} Hz ({args.seconds:.0f}s of audio, {args.repeats} passes)")
+        for name, seconds in timings.items():
+            print(f"   {name:<12} {seconds / args.seconds * 1000:7.3f} ms per audio second")
+        print(f"   speedup:     {timings['librosa'] / timings['soxr pooled']:.1f}x, "
+              f"difference {error_db:.1f} dBFS RMS")
+
+    return 0
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far (ru_maxrss is KiB on Linux, bytes on macOS)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024
+
+
+def render_episode(mode: str, speech_path: str, minutes: float, output_dir: str):
+    """Pitch-shift, assemble, mix with a music bed, enhance and write a long episode.
+
+    ``float64`` and ``float32`` run the same in-memory stages with the given
+    sample type (``float64`` is what sf.read and np.linspace produce by default);
+    ``pipeline`` runs the service's own stages: float32 assembly into one
+    preallocated buffer and the block-streamed mixer with enhancement.
+    """
+    import soundfile as sf
+    from multi_speaker_audio import AudioMixer, MusicGenerator, assemble_segments
+    from pitch_shift import pitch_shifter
+
+    speech, sample_rate = sf.read(speech_path, dtype="float32")
+    sentences = -(-int(minutes * 60 * sample_rate) // len(speech))
+    music = MusicGenerator(output_dir)
+
+    if mode == "pipeline":
+        parts = [(pitch_shifter.shift(speech, sample_rate, -2.0), 0.5) for _ in range(sentences)]
+        voice = assemble_segments(parts, sample_rate)
+        background = music.generate_music("ambient", 30.0, 0.3)
+        AudioMixer(output_dir)._render_production(voice, sample_rate, None, None, background, True, None)
+        return
+
+    dtype = np.float64 if mode == "float64" else np.float32
+    pause = np.zeros(int(0.5 * sample_rate), dtype=dtype)
+    shifted = [pitch_shifter.shift(speech, sample_rate, -2.0).astype(dtype) for _ in range(sentences)]
+    voice = np.concatenate([part for sentence in shifted for part in (sentence, pause)])
+    del shifted
+
+    bed = np.resize(music.get_loop("ambient").astype(dtype), len(voice))
+    bed *= dtype(0.3)
+    mixed = voice + bed * dtype(0.15)
+    del voice, bed
+    mixed *= dtype(0.95) / np.max(np.abs(mixed))
+    mixed[np.abs(mixed) < 0.01] *= dtype(0.1)
+    sf.write(os.path.join(output_dir, f"episode_{mode}.wav"), np.clip(mixed, -1.0, 1.0), sample_rate, subtype="PCM_16")
+
+
+def _memory_worker(mode: str, speech_path: str, minutes: float, output_dir: str, results):
+    baseline = peak_rss_mb()
+    start_time = time.time()
+    render_episode(mode, speech_path, minutes, output_dir)
+    results.put((mode, peak_rss_mb() - baseline, time.time() - start_time))
+
+
+def benchmark_memory(args) -> int:
+    import soundfile as sf
+
+    print("🧠 Peak memory of a long episode render: float64 vs float32")
+    print("=" * 40)
+
+    speech, sample_rate = load_or_synthesize_speech(args.input, args.model)
+    print(f"Episode: {args.minutes:.0f} minutes at {sample_rate} Hz, built from {len(speech) / sample_rate:.1f}s of speech")
+
+    # One fresh process per mode so each peak RSS is measured in isolation
+    ctx = mp.get_context("spawn")
+    results = ctx.Queue()
+    peaks = {}
+    with tempfile.TemporaryDirectory() as output_dir:
+        speech_path = os.path.join(output_dir, "speech.wav")
+        sf.write(speech_path, speech, sample_rate, subtype="FLOAT")
+        for mode in ("float64", "float32", "pipeline"):
+            process = ctx.Process(target=_memory_worker, args=(mode, speech_path, args.minutes, output_dir, results))
+            process.start()
+            process.join()
+            if process.exitcode != 0:
+                print(f"❌ {mode} run failed (exit code {process.exitcode})")
+                return 1
+            _, peak, elapsed = results.get()
+            peaks[mode] = peak
+            print(f"   {mode:<9} peak RSS +{peak:8.1f} MB over baseline  ({elapsed:.1f}s)")
+
+    print(f"\n📊 float32 vs float64: {(1 - peaks['float32'] / peaks['float64']) * 100:.0f}% less peak memory")
+    print(f"   service pipeline vs float64: {(1 - peaks['pipeline'] / peaks['float64']) * 100:.0f}% less peak memory")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AI Service benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    cpu_mode = subparsers.add_parser("cpu-mode", help="Compare default and fast CPU Coqui inference")
+    cpu_mode.add_argument("--model", default=DEFAULT_TTS_MODEL)
+    cpu_mode.add_argument("--threads", type=int, default=torch.get_num_threads())
+    cpu_mode.add_argument("--interop-threads", type=int, default=1)
+    cpu_mode.add_argument("--repeats", type=int, default=3)
+    cpu_mode.add_argument("--save", action="store_true", help="Write the rendered sentences for listening")
+    cpu_mode.set_defaults(func=benchmark_cpu_mode)
+
+    pitch = subparsers.add_parser("pitch-shift", help="Compare pitch shift backends on speech")
+    pitch.add_argument("--input", help="Speech WAV file (default: synthesize the benchmark sentences)")
+    pitch.add_argument("--model", default=DEFAULT_TTS_MODEL)
+    pitch.add_argument("--semitones", type=float, default=-2.0)
+    pitch.add_argument("--repeats", type=int, default=3)
+    pitch.add_argument("--save", action="store_true", help="Write the shifted audio for listening")
+    pitch.set_defaults(func=benchmark_pitch_shift)
+
+    resample = subparsers.add_parser("resample", help="Compare resampling backends for common rate pairs")
+    resample.add_argument("--seconds", type=float, default=60.0)
+    resample.add_argument("--repeats", type=int, default=3)
+    resample.add_argument("--quality", default="HQ", help="soxr quality: QQ, LQ, MQ, HQ or VHQ")
+    resample.set_defaults(func=benchmark_resample)
+
+    memory = subparsers.add_parser("memory", help="Compare peak RSS of a long episode render by sample type")
+    memory.add_argument("--input", help="Speech WAV file (default: synthesize the benchmark sentences)")
+    memory.add_argument("--model", default=DEFAULT_TTS_MODEL)
+    memory.add_argument("--minutes", type=float, default=60.0)
+    memory.set_defaults(func=benchmark_memory)
+
+    args = parser.parse_args()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Chunked Noise Reduction for AI Service
+Overlap-add denoising of long recordings on a process pool with bounded memory
+"""
+
+import os
+import time
+import uuid
+import shutil
+import logging
+import multiprocessing as mp
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+import soundfile as sf
+import librosa
+import noisereduce as nr
+from pedalboard import Pedalboard
+
+from resampling import resampler
+
+logger = logging.getLogger(__name__)
+
+
+def _denoise_window(window: np.ndarray, sample_rate: int, noise_clip: Optional[np.ndarray]) -> np.ndarray:
+    """Worker process: denoise one window against the shared noise profile"""
+    if noise_clip is not None:
+        reduced = nr.reduce_noise(y=window, sr=sample_rate, y_noise=noise_clip, stationary=True)
+    else:
+        reduced = nr.reduce_noise(y=window, sr=sample_rate)
+    return np.asarray(reduced, dtype=np.float32)
+
+
+def _read_mono(source: sf.SoundFile, frames: int) -> np.ndarray:
+    audio = source.read(frames, dtype="float32", always_2d=True)
+    return audio.mean(axis=1) if audio.shape[1] > 1 else audio[:, 0]
+
+
+def estimate_noise_clip(path: str, scan_seconds: float = 60.0, frame_ms: float = 50.0,
+                        quantile: float = 0.1, min_seconds: float = 0.5) -> Optional[np.ndarray]:
+    """Collect the quietest frames from the start of a recording as a noise-only clip.
+
+    Returns None when too little audio is available for a usable profile.
+    """
+    with sf.SoundFile(path) as source:
+        sample_rate = source.samplerate
+        audio = _read_mono(source, int(scan_seconds * sample_rate))
+
+    frame = max(1, int(frame_ms / 1000.0 * sample_rate))
+    num_frames = len(audio) // frame
+    if num_frames * frame < min_seconds * sample_rate:
+        return None
+
+    frames = audio[:num_frames * frame].reshape(num_frames, frame)
+    rms = np.sqrt(np.mean(frames ** 2, axis=1))
+    quiet = frames[rms <= np.quantile(rms, quantile)]
+
+    # Too few quiet frames: pad with the next quietest so the profile spans min_seconds
+    needed = int(np.ceil(min_seconds * sample_rate / frame))
+    if len(quiet) < needed:
+        quiet = frames[np.argsort(rms)[:needed]]
+    return quiet.reshape(-1).astype(np.float32)
+
+
+class ChunkedDenoiser:
+    """Denoise and enhance long recordings window by window.
+
+    The input is read in overlapping windows that are denoised in parallel on a
+    process pool, all against one noise profile so every window is treated
+    alike. Results come back in order and neighbouring windows are crossfaded
+    over the overlap with complementary raised-cosine ramps, which sum to one
+    and leave no seam. Only ``max_workers * 2`` windows are in flight, so memory
+    is bounded by the window size, not the recording length. Stateful stages
+    (pedalboard compressor, reverb, effects) run afterwards in the calling
+    thread with their state carried across blocks.
+    """
+
+    def __init__(self, max_workers: int = 2, window_seconds: float = 30.0, overlap_seconds: float = 0.5):
+        self.max_workers = max_workers
+        self.window_seconds = window_seconds
+        self.overlap_seconds = overlap_seconds
+        self.files_processed = 0
+        self.audio_seconds_processed = 0.0
+        self.total_processing_time = 0.0
+        self._executor = None
+
+    def start(self):
+        self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=mp.get_context("spawn"))
+
+    def stop(self):
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _iter_denoised(self, source: sf.SoundFile, noise_clip: Optional[np.ndarray]) -> Iterator[np.ndarray]:
+        """Yield denoised audio in order, stitched across window boundaries"""
+        sample_rate = source.samplerate
+        total = source.frames
+        if total == 0:
+            return
+
+        window = int(self.window_seconds * sample_rate)
+        overlap = min(int(self.overlap_seconds * sample_rate), window // 2)
+        hop = window - overlap
+        num_windows = 1 if total <= window else 1 + int(np.ceil((total - window) / hop))
+
+        ramp = np.sin(np.linspace(0.0, np.pi / 2, overlap, dtype=np.float32)) ** 2
+        fade_in, fade_out = ramp, 1.0 - ramp
+
+        in_flight = deque()
+        carry = np.zeros(0, dtype=np.float32)
+        previous_tail = None
+        submitted = 0
+
+        for index in range(num_windows):
+            # Keep the pool busy without reading more than a few windows ahead
+            while submitted < num_windows and len(in_flight) < self.max_workers * 2:
+                fresh = _read_mono(source, window - len(carry))
+                chunk = np.concatenate([carry, fresh]) if len(carry) else fresh
+                carry = chunk[hop:]
+                in_flight.append(self._executor.submit(_denoise_window, chunk, sample_rate, noise_clip))
+                submitted += 1
+
+            denoised = in_flight.popleft().result()
+            if previous_tail is not None:
+                denoised[:overlap] = previous_tail * fade_out + denoised[:overlap] * fade_in
+
+            if index < num_windows - 1:
+                # Every window but the last is full length; hold back its overlap for the next one
+                previous_tail = denoised[hop:].copy()
+                yield denoised[:hop]
+            else:
+                yield denoised
+
+    @staticmethod
+    def _iter_blocks(source: sf.SoundFile, block_size: int) -> Iterator[np.ndarray]:
+        while True:
+            block = _read_mono(source, block_size)
+            if not len(block):
+                return
+            yield block
+
+    def process_file(self, input_path: str, output_path: str, denoise: bool = True,
+                     enhance_plugins: Optional[List[Any]] = None, normalize: bool = False,
+                     effects: Optional[List[Any]] = None, noise_clip: Optional[np.ndarray] = None,
+                     noise_sample_rate: Optional[int] = None, block_size: int = 65536,
+                     work_dir: Optional[str] = None) -> Dict[str, Any]:
+        """Denoise/enhance ``input_path`` into ``output_path`` (blocking).
+
+        Stage one streams denoise + enhancement; when peak normalization or
+        effects are requested it writes a float32 intermediate and stage two
+        applies gain and effects while encoding the output. Intermediates go
+        to ``work_dir`` (created and removed here) or next to the output.
+        """
+        start_time = time.time()
+        decoded_path = None
+        stage_path = None
+        if work_dir:
+            os.makedirs(work_dir, exist_ok=True)
+        scratch_prefix = os.path.join(work_dir, os.path.basename(output_path)) if work_dir else output_path
+        try:
+            try:
+                source = sf.SoundFile(input_path)
+            except RuntimeError:
+                # Formats libsndfile cannot read (e.g. some MP3/M4A) are decoded once up front
+                audio, sample_rate = librosa.load(input_path, sr=None)
+                decoded_path = f"{scratch_prefix}.{uuid.uuid4().hex[:8]}.decoded.wav"
+                sf.write(decoded_path, audio, sample_rate, subtype="FLOAT")
+                del audio
+                input_path = decoded_path
+                source = sf.SoundFile(input_path)
+
+            sample_rate = source.samplerate
+            profile_source = "provided" if noise_clip is not None else None
+            if noise_clip is not None and noise_sample_rate and noise_sample_rate != sample_rate:
+                noise_clip = resampler.resample(noise_clip, noise_sample_rate, sample_rate)
+            if denoise and noise_clip is None:
+                noise_clip = estimate_noise_clip(input_path)
+                profile_source = "estimated" if noise_clip is not None else None
+
+            blocks = self._iter_denoised(source, noise_clip) if denoise else self._iter_blocks(source, block_size)
+
+            two_pass = normalize or bool(effects)
+            stage_path = f"{scratch_prefix}.{uuid.uuid4().hex[:8]}.stage.wav" if two_pass else output_path
+            board = Pedalboard(enhance_plugins) if enhance_plugins else None
+            peak = 0.0
+            frames = 0
+
+            with source, sf.SoundFile(stage_path, "w", samplerate=sample_rate, channels=1,
+                                      subtype="FLOAT" if two_pass else "PCM_16") as stage:
+                for block in blocks:
+                    if board is not None:
+                        block = board(block, sample_rate, reset=False)
+                    if len(block):
+                        peak = max(peak, float(np.max(np.abs(block))))
+                    frames += len(block)
+                    stage.write(block if two_pass else np.clip(block, -1.0, 1.0))
+
+            if two_pass:
+                gain = 1.0 / peak if normalize and peak > 0 else 1.0
+                effects_board = Pedalboard(effects) if effects else None
+                with sf.SoundFile(stage_path) as stage, \
+                        sf.SoundFile(output_path, "w", samplerate=sample_rate, channels=1, subtype="PCM_16") as out:
+                    for block in stage.blocks(blocksize=block_size, dtype="float32"):
+                        block *= gain
+                        if effects_board is not None:
+                            block = effects_board(block, sample_rate, reset=False)
+                        out.write(np.clip(block, -1.0, 1.0))
+        finally:
+            for path in (decoded_path, stage_path if stage_path != output_path else None):
+                if path and os.path.exists(path):
+                    os.remove(path)
+            if work_dir:
+                shutil.rmtree(work_dir, ignore_errors=True)
+
+        processing_time = time.time() - start_time
+        duration = frames / sample_rate
+        self.files_processed += 1
+        self.audio_seconds_processed += duration
+        self.total_processing_time += processing_time
+        logger.info(f"Processed {duration:.1f}s of audio in {processing_time:.1f}s")
+
+        return {
+            "duration": duration,
+            "sample_rate": sample_rate,
+            "noise_profile": profile_source if denoise else None,
+            "processing_time": processing_time
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.max_workers,
+            "window_seconds": self.window_seconds,
+            "files_processed": self.files_processed,
+            "audio_seconds_processed": self.audio_seconds_processed,
+            "realtime_factor": (self.total_processing_time / self.audio_seconds_processed
+                                if self.audio_seconds_processed else 0)
+        }
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+File Serving for AI Service
+Range requests, content-hash ETags and conditional GET for generated audio
+"""
+
+import os
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from email.utils import formatdate
+from typing import Dict, Optional, Tuple
+
+import aiofiles
+from fastapi import Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+
+logger = logging.getLogger(__name__)
+
+_HASH_BLOCK = 1024 * 1024
+_STREAM_CHUNK = 64 * 1024
+
+# Generated outputs are written once under unique names and never rewritten, so a
+# URL always maps to the same bytes and clients may cache them indefinitely
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class ContentHashCache:
+    """SHA-256 of served files, recomputed only when a file's mtime or size changes"""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self.hashes_computed = 0
+        self._entries = OrderedDict()  # path -> (mtime_ns, size, digest)
+        self._lock = threading.Lock()
+
+    def _hash_file(self, path: str) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(_HASH_BLOCK), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def digest(self, path: str, stat: os.stat_result) -> str:
+        """Content hash of ``path`` (blocking on a miss)"""
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+                self._entries.move_to_end(path)
+                return entry[2]
+
+        digest = self._hash_file(path)
+        with self._lock:
+            self.hashes_computed += 1
+            self._entries[path] = (stat.st_mtime_ns, stat.st_size, digest)
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return digest
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "hashes_computed": self.hashes_computed}
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """If-None-Match uses weak comparison: W/ prefixes are ignored"""
+    if header.strip() == "*":
+        return True
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single ``bytes=`` range into inclusive (start, end).
+
+    Returns None when the header should be ignored (malformed or multiple
+    ranges, which are answered with the full file) and raises ValueError when
+    the range cannot be satisfied.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    start_text, _, end_text = spec.strip().partition("-")
+
+    if not start_text:
+        # Suffix range: the last N bytes
+        if not end_text.isdigit():
+            return None
+        length = int(end_text)
+        if length == 0 or size == 0:
+            raise ValueError("Range not satisfiable")
+        return max(0, size - length), size - 1
+
+    if not start_text.isdigit() or (end_text and not end_text.isdigit()):
+        return None
+    start = int(start_text)
+    end = int(end_text) if end_text else size - 1
+    if start >= size:
+        raise ValueError("Range not satisfiable")
+    if start > end:
+        return None
+    return start, min(end, size - 1)
+
+
+async def _iter_file_range(path: str, start: int, end: int):
+    async with aiofiles.open(path, "rb") as f:
+        await f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = await f.read(min(_STREAM_CHUNK, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+async def serve_file(request: Request, path: str, media_type: str, hash_cache: ContentHashCache,
+                     headers: Optional[Dict[str, str]] = None, immutable: bool = True) -> Response:
+    """Serve ``path`` with ETag/Last-Modified validators, 304s and single byte ranges"""
+    stat = os.stat(path)
+    loop = asyncio.get_event_loop()
+    digest = await loop.run_in_executor(None, hash_cache.digest, path, stat)
+
+    response_headers = {
+        "ETag": f'"{digest}"',
+        "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+        "Accept-Ranges": "bytes",
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL if immutable else "no-cache",
+        **(headers or {})
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, response_headers["ETag"]):
+        return Response(status_code=304, headers=response_headers)
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (not if_range or if_range.strip() == response_headers["ETag"]):
+        try:
+            byte_range = parse_range(range_header, stat.st_size)
+        except ValueError:
+            return Response(status_code=416, headers={**response_headers, "Content-Range": f"bytes */{stat.st_size}"})
+
+        if byte_range is not None:
+            start, end = byte_range
+            return StreamingResponse(
+                _iter_file_range(path, start, end),
+                status_code=206,
+                media_type=media_type,
+                headers={
+                    **response_headers,
+                    "Content-Range": f"bytes {start}-{end}/{stat.st_size}",
+                    "Content-Length": str(end - start + 1)
+                }
+            )
+
+    return FileResponse(
+        path=path,
+        media_type=media_type,
+        filename=os.path.basename(path),
+        headers=response_headers,
+        stat_result=stat
+    )
@@ -1,6 +1,6 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException, BackgroundTasks
+from fastapi import FastAPI, File, UploadFile, HTTPException, BackgroundTasks, WebSocket, WebSocketDisconnect, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel
 import uvicorn
 import json
@@ -12,7 +12,6 @@ import logging
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 import uuid
-from functools import lru_cache
 import hashlib
 import time
 from collections import defaultdict
@@ -21,20 +20,17 @@ from collections import defaultdict
 import numpy as np
 import soundfile as sf
 from pydub import AudioSegment
-import librosa
 import noisereduce as nr
 from pedalboard import (
     Pedalboard, Compressor, Gain, Reverb, Chorus, 
-    LadderFilter, Distortion, PitchShift, Delay
+    LadderFilter, Distortion, Delay
 )
 
 # TTS and AI models
-from TTS.api import TTS
 import torch
 import requests
 import httpx
 from tortoise.api import TextToSpeech
-from tortoise.utils.audio import load_voices
 from groq import Groq
 
 # Background tasks
@@ -42,7 +38,48 @@ from celery import Celery
 import redis
 
 # Import multi-speaker audio support
-from multi_speaker_audio import MusicGenerator, MultiSpeakerProcessor, AudioMixer
+from multi_speaker_audio import MusicGenerator, MultiSpeakerProcessor, AudioMixer, partial_path
+
+# Import streaming script support
+from script_streaming import (
+    SentenceStreamer, split_text_into_sentences, stream_script_sentences, iter_sentences,
+    pipeline_sentences, format_sse
+)
+
+# Import chunked audio streaming helpers
+from audio_streaming import wav_stream_header, pcm16_bytes
+
+# Import request coalescing support
+from request_coalescing import SingleFlight, make_request_key, normalize_text
+
+# Import persistent script cache
+from script_store import ScriptStore
+
+# Import process-pool TTS inference engine (also owns TTS model loading)
+from audio_dtype import AUDIO_DTYPE, expect_float32
+from pitch_shift import pitch_shifter
+from resampling import resampler
+from denoise import ChunkedDenoiser
+from audio_encoding import AudioEncoder, validate_format, negotiate_format, media_type_for
+from file_serving import ContentHashCache, serve_file
+from output_store import OutputStore
+from stream_packager import StreamPackager, PROTOCOLS, is_valid_stream_id, validate_protocol, stream_media_type
+from tts_engine import TTSInferenceEngine, get_tts_model, model_key, run_tts, default_worker_count, DEFAULT_TTS_MODEL
+
+# Import dynamic micro-batching for TTS jobs
+from tts_batching import MicroBatcher
+
+# Import model registry (lazy loading, memory-aware eviction, pinned warm models)
+from model_registry import model_registry
+
+# Import persistent voice conditioning profiles for Tortoise cloning
+from voice_profiles import VoiceProfileStore, is_valid_voice_id
+
+# Import reusable noise profiles for stationary denoising
+from noise_profiles import NoiseProfileStore
+
+# Import sentence-level TTS audio cache
+from sentence_cache import SentenceAudioCache
 
 # Load environment variables
 from dotenv import load_dotenv
@@ -58,6 +95,52 @@ groq_client = Groq(api_key=os.getenv("GROQ_API_KEY"))
 # Configuration
 output_dir = "outputs"
 temp_dir = "temp"
+script_model = "llama-3.1-8b-instant"
+tortoise_sample_rate = 24000
+tortoise_preset = os.getenv("TORTOISE_PRESET", "high_quality")
+stream_tts_concurrency = int(os.getenv("STREAM_TTS_CONCURRENCY", "3"))
+script_cache_path = os.getenv("SCRIPT_CACHE_PATH", os.path.join("cache", "scripts.sqlite3"))
+
+# TTS inference engine: worker processes and torch threads per worker (0 workers = in-process only)
+tts_workers = int(os.getenv("TTS_WORKERS", str(default_worker_count())))
+tts_torch_threads = int(os.getenv("TTS_TORCH_THREADS", str(max(1, (os.cpu_count() or 1) // max(1, tts_workers)))))
+tts_interop_threads = int(os.getenv("TTS_INTEROP_THREADS", "1"))
+
+# Fast CPU mode (int8 dynamic quantization + inference_mode) for every Coqui request;
+# individual requests can opt in with model="coqui-fast" regardless
+tts_fast_cpu = os.getenv("TTS_FAST_CPU", "false").lower() == "true"
+coqui_models = ("coqui", "coqui-fast")
+
+# /audio/process: denoise worker processes, window length and upload read size
+audio_process_workers = int(os.getenv("AUDIO_PROCESS_WORKERS", str(default_worker_count())))
+audio_process_window_seconds = float(os.getenv("AUDIO_PROCESS_WINDOW_SECONDS", "30"))
+upload_chunk_size = 1024 * 1024
+
+# ffmpeg processes encoding Opus/MP3 renditions of generated WAV files
+audio_encode_workers = int(os.getenv("AUDIO_ENCODE_WORKERS", "2"))
+
+# Byte quota for outputs/ and how often least recently used artifacts are collected
+output_quota_bytes = int(os.getenv("OUTPUT_QUOTA_MB", "10240")) * 1024 * 1024
+output_gc_interval = float(os.getenv("OUTPUT_GC_INTERVAL", "60"))
+
+# HLS/DASH segment length for progressive playback of long renders
+stream_segment_seconds = float(os.getenv("STREAM_SEGMENT_SECONDS", "6"))
+
+# Rendered music loops, memory-mapped across restarts
+music_loop_cache_dir = os.getenv("MUSIC_LOOP_CACHE_DIR", os.path.join("cache", "music_loops"))
+
+# TTS requests of one /batch/process call synthesized at the same time
+batch_tts_concurrency = int(os.getenv("BATCH_TTS_CONCURRENCY", "3"))
+
+# Multi-speaker segments synthesized concurrently per render
+multi_speaker_concurrency = int(os.getenv("MULTI_SPEAKER_CONCURRENCY", str(max(2, tts_workers))))
+
+# Micro-batching of sentences from concurrent requests in front of the TTS engine
+tts_batch_window_ms = float(os.getenv("TTS_BATCH_WINDOW_MS", "10"))
+tts_max_batch_size = int(os.getenv("TTS_MAX_BATCH_SIZE", "8"))
+
+# Bump whenever build_script_prompt changes so stale cached scripts are not served
+script_prompt_version = "2"
 
 # Ensure directories exist
 os.makedirs(output_dir, exist_ok=True)
@@ -99,7 +182,11 @@ class AsyncConnectionContext:
 class PerformanceCache:
     """In-memory cache for expensive operations"""
     def __init__(self):
-        self.script_cache = {}
+        self.script_store = ScriptStore(
+            script_cache_path,
+            ttl=float(os.getenv("SCRIPT_CACHE_TTL", "86400")),
+            max_disk_entries=int(os.getenv("SCRIPT_CACHE_MAX_ENTRIES", "5000"))
+        )
         self.audio_cache = {}
         self.model_cache = {}
         self.max_cache_size = 100
@@ -109,29 +196,22 @@ class PerformanceCache:
         """Generate cache key from arguments"""
         return hashlib.md5(str(args).encode()).hexdigest()
     
-    def get_script(self, topic: str, style: str) -> Optional[str]:
-        key = f"{topic}_{style}"
-        cache_entry = self.script_cache.get(key)
-        if cache_entry and time.time() - cache_entry['timestamp'] < self.cache_ttl:
-            logger.info(f"Cache hit for script: {topic[:30]}...")
+    async def get_script(self, key: str) -> Optional[str]:
+        """Look up a script by its full-request key (see script_request_key)"""
+        # SQLite reads and commits block, so they run off the event loop
+        loop = asyncio.get_event_loop()
+        script = await loop.run_in_executor(None, self.script_store.get, key)
+        if script is not None:
+            logger.info(f"Cache hit for script: {key[:8]}...")
             performance_metrics.record_cache_hit("script")
-            return cache_entry['data']
+            return script
         performance_metrics.record_cache_miss("script")
         return None
     
-    def set_script(self, topic: str, style: str, script: str):
-        key = self.get_cache_key("script", topic, style)
-        if len(self.script_cache) >= self.max_cache_size:
-            # Remove oldest entry
-            oldest_key = min(self.script_cache.keys(), 
-                           key=lambda k: self.script_cache[k]['timestamp'])
-            del self.script_cache[oldest_key]
-        
-        self.script_cache[key] = {
-            'data': script,
-            'timestamp': time.time()
-        }
-        logger.info(f"Cached script for: {topic[:30]}...")
+    async def set_script(self, key: str, script: str):
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, self.script_store.set, key, script)
+        logger.info(f"Cached script: {key[:8]}...")
     
     def get_audio(self, text_hash: str) -> Optional[str]:
         cache_entry = self.audio_cache.get(text_hash)
@@ -139,39 +219,47 @@ class PerformanceCache:
             if os.path.exists(cache_entry['file_path']):
                 logger.info(f"Cache hit for audio: {text_hash[:8]}...")
                 performance_metrics.record_cache_hit("audio")
+                output_store.touch(cache_entry['file_path'])
                 return cache_entry['file_path']
+        if cache_entry:
+            self._drop_audio(text_hash)
         performance_metrics.record_cache_miss("audio")
         return None
     
     def set_audio(self, text_hash: str, file_path: str):
+        if text_hash in self.audio_cache:
+            self._drop_audio(text_hash)
         if len(self.audio_cache) >= self.max_cache_size:
-            # Remove oldest entry and file
+            # Forget the oldest entry; its file stays until the output store collects it
             oldest_key = min(self.audio_cache.keys(), 
                            key=lambda k: self.audio_cache[k]['timestamp'])
-            old_file = self.audio_cache[oldest_key]['file_path']
-            if os.path.exists(old_file):
-                os.remove(old_file)
-            del self.audio_cache[oldest_key]
+            self._drop_audio(oldest_key)
         
         self.audio_cache[text_hash] = {
             'file_path': file_path,
             'timestamp': time.time()
         }
+        # Cached files must outlive quota collection for as long as the entry exists
+        output_store.pin(file_path, f"audio_cache:{text_hash}")
         logger.info(f"Cached audio: {text_hash[:8]}...")
+    
+    def _drop_audio(self, text_hash: str):
+        cache_entry = self.audio_cache.pop(text_hash)
+        output_store.unpin(cache_entry['file_path'], f"audio_cache:{text_hash}")
 
 # Global cache instance
 performance_cache = PerformanceCache()
 
+# Per-sentence TTS audio, shared by all workers through the cache directory
+sentence_audio_cache = SentenceAudioCache(
+    os.getenv("SENTENCE_CACHE_DIR", os.path.join("cache", "sentences")),
+    max_memory_bytes=int(os.getenv("SENTENCE_CACHE_MEMORY_MB", "256")) * 1024 * 1024,
+    max_disk_bytes=int(os.getenv("SENTENCE_CACHE_DISK_MB", "2048")) * 1024 * 1024
+)
+
 # Global performance optimizer instance
 performance_optimizer = PerformanceOptimizer()
 
-# Model loading optimization
-@lru_cache(maxsize=3)
-def get_tts_model(model_name: str = "tts_models/en/ljspeech/tacotron2-DDC"):
-    """Load and cache TTS models"""
-    logger.info(f"Loading TTS model: {model_name}")
-    return TTS(model_name)
-
 # Async utilities for better performance
 async def async_groq_request(prompt: str, model: str = "mixtral-8x7b-32768") -> str:
     """Async wrapper for Groq API calls"""
@@ -208,9 +296,32 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Tortoise is large and only needed for cloning/tortoise requests: load it on first use
+model_registry.register("tortoise", TextToSpeech)
+
+# Conditioning latents per cloned voice, persisted across restarts
+voice_profile_store = VoiceProfileStore("voices", os.path.join("cache", "voice_profiles"))
+
+# Compressed renditions of outputs, encoded in the background
+audio_encoder = AudioEncoder(max_workers=audio_encode_workers)
+
+# Every generated artifact, kept under the output quota by LRU collection
+output_store = OutputStore(output_dir, max_bytes=output_quota_bytes, gc_interval=output_gc_interval)
+
+# Segmented (HLS/DASH) streams, published segment by segment while rendering
+stream_packager = StreamPackager(os.path.join(output_dir, "streams"), segment_seconds=stream_segment_seconds)
+
+# Content hashes behind the ETags of served outputs
+output_hash_cache = ContentHashCache()
+
+# Noise clips per recording setup (voice, user or room), reused across requests
+noise_profile_store = NoiseProfileStore(os.path.join("cache", "noise_profiles"))
+
 # Initialize components
 tts_model = None
-tortoise_tts = None
+tts_engine = None
+tts_batcher = None
+audio_denoiser = None
 music_generator = None
 multi_speaker_processor = None
 audio_mixer = None
@@ -234,13 +345,17 @@ class TTSRequest(BaseModel):
     voice: str = "default"
     speed: float = 1.0
     pitch: float = 0.0
-    model: str = "coqui"  # "coqui" or "tortoise"
+    model: str = "coqui"  # "coqui", "coqui-fast" or "tortoise"
+    output_format: str = "wav"  # "wav", "opus" or "mp3"
+    bitrate: str = "standard"  # "low", "standard" or "high"
 
 class MultiSpeakerTTSRequest(BaseModel):
     segments: List[Dict[str, Any]]  # [{"speaker": 1, "text": "Hello", "voice": "female"}]
     voices: Dict[str, str] = {"speaker1": "female", "speaker2": "male"}
     speeds: Dict[str, float] = {"speaker1": 1.0, "speaker2": 1.0}
     model: str = "coqui"
+    output_format: str = "wav"
+    bitrate: str = "standard"
 
 class MusicRequest(BaseModel):
     style: str = "ambient"  # ambient, upbeat, dramatic, relaxing
@@ -256,16 +371,27 @@ class PodcastProductionRequest(BaseModel):
     outro_music: Optional[MusicRequest] = None
     background_music: Optional[MusicRequest] = None
     final_mix: bool = True
+    effects: Dict = {}  # {"reverb": true, "chorus": true, "compressor": true}
+    output_format: str = "wav"
+    bitrate: str = "standard"
+    stream_protocol: Optional[str] = None  # "hls" or "dash": publish segments while mixing
 
 class VoiceCloneRequest(BaseModel):
     text: str
     voice_name: str
     speed: float = 1.0
 
+class VoiceSynthesisRequest(BaseModel):
+    text: str
+    preset: str = tortoise_preset
+
 class AudioProcessRequest(BaseModel):
     enhance_audio: bool = True
     remove_noise: bool = True
     normalize: bool = True
+    noise_profile_id: Optional[str] = None  # stored noise profile for stationary denoising
+    output_format: str = "wav"
+    bitrate: str = "standard"
     add_effects: bool = False
     effects: Dict = {}
 
@@ -276,6 +402,33 @@ class PodcastGenerationRequest(BaseModel):
     include_music: bool = False
     music_style: str = "ambient"
 
+# Single-flight coalescing for identical in-flight requests
+script_flight = SingleFlight("script")
+tts_flight = SingleFlight("tts")
+
+def script_request_key(request: ScriptRequest) -> str:
+    """Cache and coalescing key over every script parameter and the prompt version"""
+    params = request.dict()
+    params["topic"] = normalize_text(request.topic)
+    params["style"] = normalize_text(request.style)
+    params["tone"] = normalize_text(request.tone)
+    params["prompt_version"] = script_prompt_version
+    return make_request_key("script", params)
+
+def tts_request_key(request: TTSRequest, cleaned_text: str) -> str:
+    """Coalescing key over the cleaned text and every voice setting"""
+    return make_request_key("tts", {
+        "text": cleaned_text,
+        "voice": request.voice,
+        "speed": request.speed,
+        "pitch": request.pitch,
+        "model": request.model
+    })
+
+def tts_audio_cache_key(request: TTSRequest, cleaned_text: str) -> str:
+    """Whole-text audio cache key shared by the buffered and streaming TTS endpoints"""
+    return f"tts_{get_text_hash(cleaned_text)}_{request.model}_{request.voice}_{request.speed}_{request.pitch}"
+
 # Celery for background tasks
 celery_app = Celery(
     "ai_service",
@@ -289,7 +442,7 @@ redis_client = redis.Redis(host='localhost', port=6379, db=1)
 @app.on_event("startup")
 async def startup_event():
     """Initialize TTS models and audio processors on startup"""
-    global tts_model, tortoise_tts, music_generator, multi_speaker_processor, audio_mixer
+    global tts_model, tts_engine, tts_batcher, audio_denoiser, music_generator, multi_speaker_processor, audio_mixer
     
     logger.info("Starting AI Service with Multi-Speaker and Music Support...")
     
@@ -298,12 +451,53 @@ async def startup_event():
         tts_model = get_tts_model()
         logger.info("✅ Coqui TTS model loaded successfully")
         
+        # Load any other models pinned warm via PINNED_MODELS
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, model_registry.warm)
+        
+        # Start model-resident TTS worker processes
+        if tts_workers > 0:
+            tts_engine = TTSInferenceEngine(
+                num_workers=tts_workers,
+                torch_threads=tts_torch_threads,
+                interop_threads=tts_interop_threads,
+                preload_fast_cpu=tts_fast_cpu
+            )
+            tts_engine.start()
+            logger.info(f"✅ TTS inference engine started with {tts_workers} workers")
+            
+            # Sentences arriving within one window share a batch; keep every worker busy
+            tts_batcher = MicroBatcher(
+                tts_engine.submit_batch,
+                max_batch_size=tts_max_batch_size,
+                window_ms=tts_batch_window_ms,
+                max_concurrent_batches=tts_workers
+            )
+            tts_batcher.start()
+        
+        # Process pool for chunked noise reduction of uploads
+        audio_denoiser = ChunkedDenoiser(
+            max_workers=audio_process_workers,
+            window_seconds=audio_process_window_seconds
+        )
+        audio_denoiser.start()
+        
+        # Quota collection of outputs/ (also indexes files left from earlier runs)
+        output_store.start()
+        
         # Initialize audio production components
-        music_generator = MusicGenerator(output_dir)
+        music_generator = MusicGenerator(output_dir, loop_cache_dir=music_loop_cache_dir)
         audio_mixer = AudioMixer(output_dir)
         
         if tts_model:
-            multi_speaker_processor = MultiSpeakerProcessor(tts_model)
+            # Segments go through the same worker pool and sentence cache as single-speaker TTS
+            multi_speaker_processor = MultiSpeakerProcessor(
+                tts_model,
+                synthesize_fn=lambda text, speed, pitch: render_speech_audio(
+                    text, speed, pitch, fast_cpu=use_fast_cpu("coqui")
+                ),
+                max_workers=multi_speaker_concurrency
+            )
             logger.info("✅ Multi-speaker processor initialized")
         
         logger.info("✅ Music generator and audio mixer initialized")
@@ -311,6 +505,19 @@ async def startup_event():
     except Exception as e:
         logger.error(f"Failed to initialize audio components: {e}")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop TTS worker processes"""
+    if tts_batcher:
+        tts_batcher.stop()
+    if tts_engine:
+        tts_engine.stop()
+    if audio_denoiser:
+        audio_denoiser.stop()
+    output_store.stop()
+    performance_cache.script_store.flush()
+    sentence_audio_cache.flush()
+
 # Utility functions
 def generate_unique_filename(extension: str = "wav") -> str:
     """Generate unique filename with timestamp"""
@@ -319,33 +526,189 @@ def generate_unique_filename(extension: str = "wav") -> str:
     return f"{timestamp}_{unique_id}.{extension}"
 
 async def save_audio_file(audio_data: np.ndarray, sample_rate: int = 22050) -> str:
-    """Save audio data to file"""
+    """Save audio data to file without blocking the event loop"""
     filename = generate_unique_filename("wav")
     filepath = os.path.join("outputs", filename)
-    sf.write(filepath, audio_data, sample_rate)
-    return filepath
+    expect_float32(audio_data, "write")
+    loop = asyncio.get_event_loop()
+    await loop.run_in_executor(None, sf.write, filepath, audio_data, sample_rate)
+    return output_store.record(filepath)
+
+def use_fast_cpu(model: str) -> bool:
+    """Whether a Coqui request runs in fast CPU mode"""
+    return model == "coqui-fast" or tts_fast_cpu
+
+def check_output_format(output_format: str, bitrate: str):
+    """Reject unknown formats/presets before any work is done"""
+    try:
+        validate_format(output_format, bitrate)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if output_format != "wav" and not audio_encoder.available:
+        raise HTTPException(status_code=400, detail="Compressed output requires ffmpeg on the server")
 
-def enhance_audio(audio_data: np.ndarray, sample_rate: int = 22050) -> np.ndarray:
+def with_encoding(result: Dict[str, Any], output_format: str, bitrate: str, key: str = "audio_file") -> Dict[str, Any]:
+    """Start encoding the requested rendition in the background and point the response at it.
+
+    The WAV stays the master; the encoded file is served from /outputs once ready
+    (requests for it before then wait for the running encode).
+    """
+    if output_format == "wav":
+        return result
+    audio_encoder.schedule(result[key], output_format, bitrate)
+    return {
+        **result,
+        "encoded_file": audio_encoder.rendition_path(result[key], output_format, bitrate),
+        "output_format": output_format
+    }
+
+def check_stream_protocol(protocol: str, bitrate: str):
+    """Reject unknown stream protocols/presets before any work is done"""
+    try:
+        validate_protocol(protocol, bitrate)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not stream_packager.available:
+        raise HTTPException(status_code=400, detail="Segmented output requires ffmpeg on the server")
+
+def stream_info(stream_id: str, protocol: str) -> Dict[str, Any]:
+    playlist = PROTOCOLS[protocol][0]
+    return {
+        "stream_id": stream_id,
+        "protocol": protocol,
+        "playlist_url": f"/streams/{stream_id}/{playlist}",
+        "status_url": f"/streams/{stream_id}"
+    }
+
+def is_rendering_master(path: str) -> bool:
+    """Whether ``path`` is the WAV master of a stream that is still being rendered"""
+    name, ext = os.path.splitext(os.path.basename(path))
+    prefix = "full_production_"
+    return ext == ".wav" and name.startswith(prefix) and stream_packager.is_live(name[len(prefix):])
+
+async def package_stream(writer, render, inputs: Optional[List[str]] = None):
+    """Await a render feeding ``writer``, then finalize the playlist (or drop the partial stream)
+    
+    The stream and the render's ``inputs`` are pinned in the output store until it ends.
+    """
+    loop = asyncio.get_event_loop()
+    owner = f"stream:{writer.stream_id}"
+    pinned = [writer.stream_dir] + list(inputs or [])
+    for path in pinned:
+        output_store.pin(path, owner)
+    try:
+        await render
+        await loop.run_in_executor(None, writer.close)
+        for path in pinned:
+            output_store.record(path)
+    except Exception as e:
+        logger.error(f"Segmented stream {writer.stream_id} failed: {e}")
+        await loop.run_in_executor(None, writer.abort)
+    finally:
+        for path in pinned:
+            output_store.unpin(path, owner)
+
+async def synthesize_waveform(text: str, speed: float = 1.0, fast_cpu: bool = False):
+    """Synthesize one piece of text with Coqui, micro-batched onto the worker pool when it is running"""
+    if tts_batcher and tts_engine.available:
+        return await tts_batcher.submit((text, speed, fast_cpu))
+    
+    loop = asyncio.get_event_loop()
+    
+    def render():
+        # The model returns the waveform directly; no temp file round trip
+        model = get_tts_model(fast_cpu=True) if fast_cpu else tts_model
+        return run_tts(model, text, speed, fast_cpu), model.synthesizer.output_sample_rate
+    
+    return await loop.run_in_executor(None, render)
+
+async def render_sentence_audio(sentence: str, speed: float = 1.0, pitch: float = 0.0,
+                                voice: str = "default", fast_cpu: bool = False):
+    """Render one sentence, reusing the sentence audio cache; returns (audio_data, sample_rate)"""
+    key = sentence_audio_cache.make_key(sentence, model_key(DEFAULT_TTS_MODEL, fast_cpu), voice, speed, pitch)
+    loop = asyncio.get_event_loop()
+    
+    cached = await loop.run_in_executor(None, sentence_audio_cache.get, key)
+    if cached is not None:
+        performance_metrics.record_cache_hit("sentence_audio")
+        return cached
+    performance_metrics.record_cache_miss("sentence_audio")
+    
+    audio_data, sample_rate = await synthesize_waveform(sentence, speed, fast_cpu)
+    expect_float32(audio_data, "tts")
+    
+    if pitch != 0.0:
+        audio_data = await loop.run_in_executor(None, pitch_shifter.shift, audio_data, sample_rate, pitch)
+        expect_float32(audio_data, "pitch shift")
+    
+    await loop.run_in_executor(None, sentence_audio_cache.set, key, audio_data, sample_rate)
+    return audio_data, sample_rate
+
+async def render_speech_audio(text: str, speed: float = 1.0, pitch: float = 0.0,
+                              voice: str = "default", fast_cpu: bool = False):
+    """Synthesize text sentence by sentence with Coqui TTS; returns (audio_data, sample_rate)
+
+    Only sentences missing from the sentence audio cache are synthesized, so an
+    edited script re-renders just the sentences that changed.
+    """
+    sentences = split_text_into_sentences(text) or [text]
+    
+    # One sentence in flight per worker; the in-process fallback shares a single
+    # model (and the default executor), so it renders one sentence at a time
+    engine_running = tts_engine is not None and tts_engine.available
+    slots = asyncio.Semaphore(max(1, tts_workers) if engine_running else 1)
+    
+    async def render(sentence: str):
+        async with slots:
+            return await render_sentence_audio(sentence, speed, pitch, voice, fast_cpu)
+    
+    results = await asyncio.gather(*[render(sentence) for sentence in sentences])
+    sample_rate = results[0][1]
+    return np.concatenate([audio for audio, _ in results]), sample_rate
+
+def enhancement_plugins() -> List[Any]:
+    """Pedalboard chain applied after noise reduction"""
+    return [
+        Compressor(threshold_db=-16, ratio=4),
+        Gain(gain_db=2),
+        Reverb(room_size=0.25, damping=0.5, wet_level=0.1)
+    ]
+
+def enhance_audio(audio_data: np.ndarray, sample_rate: int = 22050,
+                  noise_clip: Optional[np.ndarray] = None) -> np.ndarray:
     """Apply audio enhancement"""
+    expect_float32(audio_data, "enhance")
     try:
-        # Noise reduction
-        reduced_noise = nr.reduce_noise(y=audio_data, sr=sample_rate)
+        # Noise reduction: stationary against a stored profile, otherwise estimated per call
+        if noise_clip is not None:
+            reduced_noise = nr.reduce_noise(y=audio_data, sr=sample_rate, y_noise=noise_clip, stationary=True)
+        else:
+            reduced_noise = nr.reduce_noise(y=audio_data, sr=sample_rate)
+        # noisereduce may hand back float64; convert before the board sees it
+        reduced_noise = np.asarray(reduced_noise, dtype=AUDIO_DTYPE)
         
         # Apply pedalboard effects
-        board = Pedalboard([
-            Compressor(threshold_db=-16, ratio=4),
-            Gain(gain_db=2),
-            Reverb(room_size=0.25, damping=0.5, wet_level=0.1)
-        ])
+        board = Pedalboard(enhancement_plugins())
         
         # Process audio
         enhanced = board(reduced_noise, sample_rate)
-        return enhanced
+        return expect_float32(enhanced, "enhance")
         
     except Exception as e:
         logger.error(f"Audio enhancement failed: {e}")
         return audio_data
 
+def build_effects(effects: Dict) -> List[Any]:
+    """Pedalboard plugins for a request's effects options"""
+    plugins = []
+    if effects.get("reverb"):
+        plugins.append(Reverb(room_size=0.5))
+    if effects.get("chorus"):
+        plugins.append(Chorus())
+    if effects.get("compressor"):
+        plugins.append(Compressor())
+    return plugins
+
 # Performance monitoring
 class PerformanceMetrics:
     def __init__(self):
@@ -390,8 +753,22 @@ class PerformanceMetrics:
             "response_times": metrics,
             "cache_performance": cache_metrics,
             "active_connections": performance_optimizer.active_connections,
+            "tts_engine": tts_engine.stats() if tts_engine else None,
+            "tts_batching": tts_batcher.stats() if tts_batcher else None,
+            "sentence_audio_cache": sentence_audio_cache.stats(),
+            "resampling": resampler.stats(),
+            "audio_processing": audio_denoiser.stats() if audio_denoiser else None,
+            "audio_encoding": audio_encoder.stats(),
+            "output_etags": output_hash_cache.stats(),
+            "segmented_streams": stream_packager.stats(),
+            "output_store": output_store.stats(),
+            "request_coalescing": {
+                "script": script_flight.stats(),
+                "tts": tts_flight.stats()
+            },
             "cache_size": {
-                "scripts": len(performance_cache.script_cache),
+                "scripts": performance_cache.script_store.memory_size(),
+                "scripts_on_disk": performance_cache.script_store.size(),
                 "audio": len(performance_cache.audio_cache)
             }
         }
@@ -402,7 +779,9 @@ performance_metrics = PerformanceMetrics()
 @app.get("/metrics")
 async def get_performance_metrics():
     """Get performance metrics and statistics"""
-    return performance_metrics.get_metrics()
+    # Includes a SQLite row count, so it is gathered off the event loop
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(None, performance_metrics.get_metrics)
 
 # API Endpoints
 
@@ -416,7 +795,9 @@ async def models_status():
     """Check status of loaded AI models"""
     status = {
         "coqui_tts": tts_model is not None,
-        "tortoise_tts": tortoise_tts is not None,
+        "tts_engine": tts_engine.stats() if tts_engine else None,
+        "tortoise_tts": model_registry.is_loaded("tortoise"),
+        "model_registry": model_registry.status(),
         "ollama_available": False
     }
     
@@ -437,213 +818,564 @@ async def generate_script(request: ScriptRequest):
     """Generate podcast script using Groq with caching"""
     try:
         # Check cache first
-        cached_script = performance_cache.get_script(request.topic, request.style)
+        cache_key = script_request_key(request)
+        cached_script = await performance_cache.get_script(cache_key)
         if cached_script:
-            performance_metrics.record_cache_hit("script")
             return {"script": cached_script, "cached": True}
-        else:
-            performance_metrics.record_cache_miss("script")
-        
-        start_time = time.time()
-        
-        prompt = f"""
-        You are creating audio content that will be read by a text-to-speech system. Write ONLY the spoken words that should be heard by listeners.
-
-        Topic: {request.topic}
-        Duration: {request.duration_minutes} minutes
-        Style: {request.style}
-        Tone: {request.tone}
-
-        CRITICAL RULES - DO NOT INCLUDE:
-        ❌ NO episode titles, headings, or section labels
-        ❌ NO timestamps like [0:00] or (2:15)
-        ❌ NO stage directions like [music plays] or [pause]
-        ❌ NO speaker labels like "HOST:" or "NARRATOR:"
-        ❌ NO markdown formatting like **bold** or *italics*
-        ❌ NO bullet points or numbered lists
-        ❌ NO sound effects descriptions
-        ❌ NO technical instructions or notes
-
-        WRITE ONLY:
-        ✅ Natural, conversational speech
-        ✅ Complete sentences with proper punctuation
-        ✅ Direct address to the listener ("you", "we", "let's")
-        ✅ Smooth transitions between ideas
-        ✅ Rhetorical questions to engage listeners
-
-        {'✅ Start with an engaging hook' if request.include_intro else ''}
-        {'✅ End with a memorable conclusion' if request.include_outro else ''}
-
-        Example of what TO write:
-        "Welcome to today's discussion about technology. Have you ever wondered how artificial intelligence is changing our daily lives? Let's explore this fascinating topic together..."
-
-        Example of what NOT to write:
-        "**Welcome to TechTalk!** [upbeat music] HOST: Today we're discussing... [00:30]"
-
-        Now write {request.duration_minutes} minutes of natural speech about {request.topic} in a {request.style} {request.tone} style:
-        """
-        
-        # Use async Groq for better performance
-        script_content = await async_groq_request(prompt, "llama-3.1-8b-instant")
-        
-        # Cache the result
-        performance_cache.set_script(request.topic, request.style, script_content)
         
-        generation_time = time.time() - start_time
-        logger.info(f"Script generated in {generation_time:.2f}s for: {request.topic[:30]}...")
-        performance_metrics.record_request_time("/script/generate", generation_time)
-        
-        return {
-            "script": script_content,
-            "cached": False,
-            "generation_time": generation_time
-        }
+        # Identical requests already in flight share one Groq call
+        result, coalesced = await script_flight.run(
+            cache_key,
+            lambda: run_script_generation(request, cache_key)
+        )
+        if coalesced:
+            return {**result, "coalesced": True}
+        return result
     except Exception as e:
         logger.error(f"Script generation failed: {e}")
         raise HTTPException(status_code=500, detail=f"Script generation failed: {str(e)}")
 
+async def run_script_generation(request: ScriptRequest, cache_key: str) -> Dict[str, Any]:
+    """Call Groq for a script and cache the result"""
+    start_time = time.time()
+    
+    prompt = build_script_prompt(request)
+    
+    # Use async Groq for better performance
+    script_content = await async_groq_request(prompt, script_model)
+    
+    # Cache the result
+    await performance_cache.set_script(cache_key, script_content)
+    
+    generation_time = time.time() - start_time
+    logger.info(f"Script generated in {generation_time:.2f}s for: {request.topic[:30]}...")
+    performance_metrics.record_request_time("/script/generate", generation_time)
+    
+    return {
+        "script": script_content,
+        "cached": False,
+        "generation_time": generation_time
+    }
+
+@app.post("/script/generate/stream")
+async def generate_script_stream(request: ScriptRequest):
+    """Stream the podcast script sentence by sentence as Server-Sent Events"""
+    cache_key = script_request_key(request)
+    cached_script = await performance_cache.get_script(cache_key)
+    
+    async def event_stream():
+        start_time = time.time()
+        streamer = SentenceStreamer()
+        try:
+            if cached_script:
+                sentences = streamer.feed(cached_script) + streamer.flush()
+                for index, sentence in enumerate(sentences):
+                    yield format_sse("sentence", {"index": index, "text": sentence})
+                yield format_sse("done", {"script": cached_script, "cached": True})
+                return
+            
+            index = 0
+            sentences = stream_script_sentences(
+                groq_client, build_script_prompt(request), script_model, streamer
+            )
+            try:
+                async for sentence in sentences:
+                    yield format_sse("sentence", {"index": index, "text": sentence})
+                    index += 1
+            finally:
+                # A disconnected client stops the Groq stream instead of draining it
+                await sentences.aclose()
+            
+            script_content = streamer.text
+            await performance_cache.set_script(cache_key, script_content)
+            
+            generation_time = time.time() - start_time
+            performance_metrics.record_request_time("/script/generate/stream", generation_time)
+            yield format_sse("done", {
+                "script": script_content,
+                "cached": False,
+                "generation_time": generation_time
+            })
+        except Exception as e:
+            logger.error(f"Streaming script generation failed: {e}")
+            yield format_sse("error", {"detail": f"Script generation failed: {str(e)}"})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/podcast/generate/stream")
+async def generate_podcast_stream(request: PodcastGenerationRequest):
+    """Generate a podcast with TTS starting on the first finished script sentences (SSE)"""
+    if request.tts_params.model not in coqui_models or not tts_model:
+        raise HTTPException(status_code=400, detail="Streaming synthesis requires the Coqui TTS model")
+    
+    speed = request.tts_params.speed
+    pitch = request.tts_params.pitch
+    voice = request.tts_params.voice
+    fast_cpu = use_fast_cpu(request.tts_params.model)
+    
+    async def synthesize_sentence(sentence: str):
+        cleaned_text = clean_text_for_tts(sentence)
+        if not cleaned_text:
+            return None
+        return await render_speech_audio(cleaned_text, speed, pitch, voice, fast_cpu)
+    
+    async def event_stream():
+        start_time = time.time()
+        first_audio_time = None
+        streamer = SentenceStreamer()
+        audio_chunks = []
+        sample_rate = 22050
+        
+        try:
+            sentences = stream_script_sentences(
+                groq_client, build_script_prompt(request.script_params), script_model, streamer
+            )
+            pipeline = pipeline_sentences(sentences, synthesize_sentence, stream_tts_concurrency)
+            try:
+                async for index, sentence, result in pipeline:
+                    yield format_sse("sentence", {"index": index, "text": sentence})
+                    if result is None:
+                        continue
+                    
+                    audio_data, sample_rate = result
+                    audio_chunks.append(audio_data)
+                    sentence_path = await save_audio_file(audio_data, sample_rate)
+                    
+                    if first_audio_time is None:
+                        first_audio_time = time.time() - start_time
+                        performance_metrics.record_request_time("time_to_first_audio", first_audio_time)
+                    
+                    yield format_sse("audio", {
+                        "index": index,
+                        "audio_file": sentence_path,
+                        "duration": len(audio_data) / sample_rate
+                    })
+            finally:
+                # A disconnected client cancels in-flight TTS and stops the Groq stream
+                await pipeline.aclose()
+            
+            script_content = streamer.text
+            await performance_cache.set_script(script_request_key(request.script_params), script_content)
+            
+            if not audio_chunks:
+                raise ValueError("No speakable sentences were generated")
+            
+            full_audio = np.concatenate(audio_chunks)
+            audio_file = await save_audio_file(full_audio, sample_rate)
+            
+            total_time = time.time() - start_time
+            performance_metrics.record_request_time("/podcast/generate/stream", total_time)
+            yield format_sse("done", {
+                "audio_file": audio_file,
+                "script": script_content,
+                "duration": len(full_audio) / sample_rate,
+                "time_to_first_audio": first_audio_time,
+                "total_time": total_time
+            })
+        except Exception as e:
+            logger.error(f"Streaming podcast generation failed: {e}")
+            yield format_sse("error", {"detail": str(e)})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.post("/tts/synthesize")
 async def synthesize_speech(request: TTSRequest):
     """Convert text to speech using selected TTS model with caching and optimization"""
+    check_output_format(request.output_format, request.bitrate)
     try:
         # Clean text for better TTS pronunciation
         cleaned_text = clean_text_for_tts(request.text)
         
         # Check cache first (use cleaned text for cache key)
-        cache_key = f"tts_{hash(cleaned_text)}_{request.model}_{request.speed}_{request.pitch}"
+        cache_key = tts_audio_cache_key(request, cleaned_text)
         cached_result = performance_cache.get_audio(cache_key)
         if cached_result:
-            performance_metrics.record_cache_hit("audio")
-            return {"success": True, "audio_file": cached_result, "cached": True}
-        else:
-            performance_metrics.record_cache_miss("audio")
+            result = {"success": True, "audio_file": cached_result, "cached": True}
+            return with_encoding(result, request.output_format, request.bitrate)
         
-        start_time = time.time()
-        
-        if request.model == "coqui" and tts_model:
-            # Use Coqui TTS with async processing
-            async with performance_optimizer.get_connection() as session:
-                with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
-                    # Run TTS in thread pool for better async performance
-                    loop = asyncio.get_event_loop()
-                    await loop.run_in_executor(
-                        None, 
-                        lambda: tts_model.tts_to_file(
-                            text=cleaned_text,  # Use cleaned text
-                            file_path=temp_file.name,
-                            speed=request.speed
-                        )
-                    )
-                    
-                    # Load and process audio asynchronously
-                    audio_data, sample_rate = await loop.run_in_executor(
-                        None, sf.read, temp_file.name
-                    )
-                    
-                    # Apply pitch shift if requested
-                    if request.pitch != 0.0:
-                        board = Pedalboard([PitchShift(semitones=request.pitch)])
-                        audio_data = await loop.run_in_executor(
-                            None, lambda: board(audio_data, sample_rate)
-                        )
-                    
-                    # Save final audio
-                    output_path = await save_audio_file(audio_data, sample_rate)
-                    
-                    # Cache the result
-                    performance_cache.set_audio(cache_key, output_path)
-                    
-                    # Clean up temp file
-                    os.unlink(temp_file.name)
-                    
-                    synthesis_time = time.time() - start_time
-                    logger.info(f"TTS synthesis completed in {synthesis_time:.2f}s")
-                    performance_metrics.record_request_time("/tts/synthesize", synthesis_time)
-                    
-                    return {
-                        "success": True,
-                        "audio_file": output_path,
-                        "duration": len(audio_data) / sample_rate,
-                        "model_used": "coqui",
-                        "synthesis_time": synthesis_time,
-                        "cached": False
-                    }
-                
-        elif request.model == "tortoise" and tortoise_tts:
-            # Use Tortoise TTS with async optimization
-            async with performance_optimizer.get_connection() as session:
-                loop = asyncio.get_event_loop()
-                audio_data = await loop.run_in_executor(
-                    None,
-                    lambda: tortoise_tts.tts_with_preset(
-                        request.text,
-                        voice_samples=None,  # Would need voice samples
-                        preset="fast"
-                    )
-                )
-                
-                output_path = await save_audio_file(audio_data.cpu().numpy())
-                
-                # Cache the result
-                performance_cache.set_audio(cache_key, output_path)
-                
-                synthesis_time = time.time() - start_time
-                performance_metrics.record_request_time("/tts/synthesize", synthesis_time)
-                
-                return {
-                    "success": True,
-                    "audio_file": output_path,
-                    "model_used": "tortoise",
-                    "synthesis_time": synthesis_time,
-                    "cached": False
-                }
-        else:
-            raise HTTPException(status_code=400, detail="TTS model not available")
+        # Identical text/voice settings already in flight share one synthesis
+        result, coalesced = await tts_flight.run(
+            tts_request_key(request, cleaned_text),
+            lambda: run_speech_synthesis(request, cleaned_text, cache_key)
+        )
+        if coalesced:
+            result = {**result, "coalesced": True}
+        return with_encoding(result, request.output_format, request.bitrate)
             
     except Exception as e:
         logger.error(f"TTS synthesis failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+async def synthesize_speech_waveform(request: TTSRequest, cleaned_text: str):
+    """Synthesize with the requested model and keep the result in memory; returns (audio_data, sample_rate)"""
+    if request.model in coqui_models and tts_model:
+        # Use Coqui TTS (worker pool when available) with async processing
+        async with await performance_optimizer.get_connection():
+            return await render_speech_audio(cleaned_text, request.speed, request.pitch, request.voice,
+                                             use_fast_cpu(request.model))
+    
+    elif request.model == "tortoise":
+        # Use Tortoise TTS (loaded on first use) with async optimization
+        tortoise_tts = await model_registry.aget("tortoise")
+        loop = asyncio.get_event_loop()
+        
+        # A cloned voice id reuses its stored conditioning latents
+        conditioning_latents = None
+        if request.voice != "default" and is_valid_voice_id(request.voice):
+            conditioning_latents = await loop.run_in_executor(None, voice_profile_store.get, request.voice)
+        
+        if conditioning_latents is not None:
+            audio_data = await synthesize_cloned_voice(tortoise_tts, cleaned_text, conditioning_latents, "fast")
+            return audio_data, tortoise_sample_rate
+        
+        async with await performance_optimizer.get_connection():
+            audio_tensor = await loop.run_in_executor(
+                None,
+                lambda: tortoise_tts.tts_with_preset(
+                    cleaned_text,
+                    voice_samples=None,  # Would need voice samples
+                    preset="fast"
+                )
+            )
+            return audio_tensor.squeeze().cpu().numpy().astype(AUDIO_DTYPE), tortoise_sample_rate
+    
+    raise HTTPException(status_code=400, detail="TTS model not available")
+
+async def run_speech_synthesis(request: TTSRequest, cleaned_text: str, cache_key: str) -> Dict[str, Any]:
+    """Synthesize speech with the requested model and cache the output file"""
+    start_time = time.time()
+    
+    audio_data, sample_rate = await synthesize_speech_waveform(request, cleaned_text)
+    
+    # Save final audio (the only disk write for this request)
+    output_path = await save_audio_file(audio_data, sample_rate)
+    
+    # Cache the result
+    performance_cache.set_audio(cache_key, output_path)
+    
+    synthesis_time = time.time() - start_time
+    logger.info(f"TTS synthesis completed in {synthesis_time:.2f}s")
+    performance_metrics.record_request_time("/tts/synthesize", synthesis_time)
+    
+    return {
+        "success": True,
+        "audio_file": output_path,
+        "duration": len(audio_data) / sample_rate,
+        "model_used": request.model,
+        "synthesis_time": synthesis_time,
+        "cached": False
+    }
+
+async def iter_speech_chunks(request: TTSRequest, cleaned_text: str, cache_key: str):
+    """Yield (audio_data, sample_rate) per sentence in script order as synthesis finishes.
+
+    Once every sentence is out, the complete waveform is written and cached under
+    the same key as /tts/synthesize so later requests are served from disk.
+    """
+    sentences = split_text_into_sentences(cleaned_text) or [cleaned_text]
+    chunks = []
+    sample_rate = 22050
+    
+    async for _, _, (audio_data, sample_rate) in pipeline_sentences(
+        iter_sentences(sentences),
+        lambda sentence: render_sentence_audio(sentence, request.speed, request.pitch, request.voice,
+                                               use_fast_cpu(request.model)),
+        stream_tts_concurrency
+    ):
+        chunks.append(audio_data)
+        yield audio_data, sample_rate
+    
+    output_path = await save_audio_file(np.concatenate(chunks), sample_rate)
+    performance_cache.set_audio(cache_key, output_path)
+
+@app.post("/tts/synthesize/stream")
+async def synthesize_speech_stream(request: TTSRequest):
+    """Stream synthesized speech as chunked WAV, one chunk per finished sentence"""
+    if request.model not in coqui_models or not tts_model:
+        raise HTTPException(status_code=400, detail="Streaming synthesis requires the Coqui TTS model")
+    
+    cleaned_text = clean_text_for_tts(request.text)
+    cache_key = tts_audio_cache_key(request, cleaned_text)
+    cached_result = performance_cache.get_audio(cache_key)
+    if cached_result:
+        return FileResponse(path=cached_result, media_type="audio/wav", headers={"X-Cache": "HIT"})
+    
+    async def audio_stream():
+        start_time = time.time()
+        header_sent = False
+        try:
+            async for audio_data, sample_rate in iter_speech_chunks(request, cleaned_text, cache_key):
+                if not header_sent:
+                    performance_metrics.record_request_time("time_to_first_audio", time.time() - start_time)
+                    yield wav_stream_header(sample_rate)
+                    header_sent = True
+                yield pcm16_bytes(audio_data)
+            performance_metrics.record_request_time("/tts/synthesize/stream", time.time() - start_time)
+        except Exception as e:
+            # Headers are already sent, so the stream just ends early
+            logger.error(f"Streaming TTS synthesis failed: {e}")
+    
+    return StreamingResponse(audio_stream(), media_type="audio/wav", headers={"X-Cache": "MISS"})
+
+@app.post("/tts/synthesize/segmented")
+async def synthesize_speech_segmented(request: TTSRequest, background_tasks: BackgroundTasks, protocol: str = "hls"):
+    """Synthesize into an HLS/DASH stream that is playable while later sentences are still rendering
+    
+    Returns the playlist URL immediately; sentences are appended in script order as
+    they finish and a segment is published every STREAM_SEGMENT_SECONDS of audio.
+    """
+    if request.model not in coqui_models or not tts_model:
+        raise HTTPException(status_code=400, detail="Segmented synthesis requires the Coqui TTS model")
+    check_stream_protocol(protocol, request.bitrate)
+    try:
+        cleaned_text = clean_text_for_tts(request.text)
+        cache_key = tts_audio_cache_key(request, cleaned_text)
+        stream_id = uuid.uuid4().hex
+        writer = stream_packager.open(
+            stream_id, tts_model.synthesizer.output_sample_rate, protocol, request.bitrate
+        )
+        
+        async def render():
+            loop = asyncio.get_event_loop()
+            async for audio_data, _ in iter_speech_chunks(request, cleaned_text, cache_key):
+                await loop.run_in_executor(None, writer.write, audio_data)
+        
+        background_tasks.add_task(package_stream, writer, render())
+        return {"success": True, **stream_info(stream_id, protocol)}
+        
+    except Exception as e:
+        logger.error(f"Segmented TTS synthesis failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.websocket("/ws/tts")
+async def synthesize_speech_ws(websocket: WebSocket):
+    """WebSocket TTS: send a TTSRequest as JSON, receive 16-bit PCM frames per sentence"""
+    await websocket.accept()
+    try:
+        request = TTSRequest(**await websocket.receive_json())
+        if request.model not in coqui_models or not tts_model:
+            await websocket.send_json({"event": "error", "detail": "Streaming synthesis requires the Coqui TTS model"})
+            return
+        
+        cleaned_text = clean_text_for_tts(request.text)
+        cache_key = tts_audio_cache_key(request, cleaned_text)
+        cached_result = performance_cache.get_audio(cache_key)
+        
+        if cached_result:
+            # Open and decode on the executor, one second per read, so a long cached
+            # file never stalls the event loop for other connections
+            loop = asyncio.get_event_loop()
+            source = await loop.run_in_executor(None, sf.SoundFile, cached_result)
+            try:
+                await websocket.send_json({
+                    "event": "start", "sample_rate": source.samplerate, "channels": source.channels,
+                    "format": "pcm_s16le", "cached": True
+                })
+                while True:
+                    block = await loop.run_in_executor(None, source.read, source.samplerate, "float32")
+                    if not len(block):
+                        break
+                    await websocket.send_bytes(pcm16_bytes(block))
+            finally:
+                source.close()
+            await websocket.send_json({"event": "done", "audio_file": cached_result, "cached": True})
+            return
+        
+        started = False
+        async for audio_data, sample_rate in iter_speech_chunks(request, cleaned_text, cache_key):
+            if not started:
+                await websocket.send_json({
+                    "event": "start", "sample_rate": sample_rate, "channels": 1,
+                    "format": "pcm_s16le", "cached": False
+                })
+                started = True
+            await websocket.send_bytes(pcm16_bytes(audio_data))
+        
+        await websocket.send_json({
+            "event": "done", "audio_file": performance_cache.get_audio(cache_key), "cached": False
+        })
+    except WebSocketDisconnect:
+        logger.info("TTS WebSocket client disconnected")
+    except Exception as e:
+        logger.error(f"WebSocket TTS synthesis failed: {e}")
+        if websocket.client_state.name != "DISCONNECTED":
+            await websocket.send_json({"event": "error", "detail": str(e)})
+    finally:
+        if websocket.client_state.name != "DISCONNECTED":
+            await websocket.close()
+
 @app.post("/voice/clone")
-async def clone_voice(request: VoiceCloneRequest, voice_samples: List[UploadFile] = File(...)):
-    """Clone voice using uploaded samples"""
+async def clone_voice(request: VoiceCloneRequest, voice_samples: Optional[List[UploadFile]] = File(None)):
+    """Clone voice using uploaded samples (or the stored profile when none are uploaded)"""
     try:
-        if not tortoise_tts:
-            raise HTTPException(status_code=400, detail="Tortoise TTS not available")
+        if not is_valid_voice_id(request.voice_name):
+            raise HTTPException(status_code=400, detail="voice_name may only contain letters, digits, '-' and '_'")
+        
+        voice_samples = voice_samples or []
+        sample_names = [os.path.basename(sample.filename or "") for sample in voice_samples]
+        if any(name in ("", ".", "..") for name in sample_names):
+            raise HTTPException(status_code=400, detail="Every voice sample needs a file name")
+        stored = voice_profile_store.has_profile(request.voice_name) or voice_profile_store.sample_paths(request.voice_name)
+        if not voice_samples and not stored:
+            raise HTTPException(status_code=404, detail=f"No stored samples for voice '{request.voice_name}'; upload voice_samples")
+        
+        try:
+            tortoise_tts = await model_registry.aget("tortoise")
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Tortoise TTS not available: {e}")
         
         # Save voice samples
-        voice_dir = os.path.join("voices", request.voice_name)
+        voice_dir = voice_profile_store.sample_dir(request.voice_name)
         os.makedirs(voice_dir, exist_ok=True)
         
-        for sample in voice_samples:
-            sample_path = os.path.join(voice_dir, sample.filename)
+        for sample, sample_name in zip(voice_samples, sample_names):
+            sample_path = os.path.join(voice_dir, sample_name)
             async with aiofiles.open(sample_path, 'wb') as f:
                 content = await sample.read()
                 await f.write(content)
         
-        # Load voice samples
-        voice_samples_data = load_voices([request.voice_name])
-        
-        # Generate speech with cloned voice
-        audio_data = tortoise_tts.tts_with_preset(
-            request.text,
-            voice_samples=voice_samples_data[request.voice_name],
-            preset="high_quality"
-        )
+        # Embed the samples once; later requests reuse the stored latents
+        loop = asyncio.get_event_loop()
+        if voice_samples:
+            conditioning_latents = await loop.run_in_executor(
+                None, voice_profile_store.compute, tortoise_tts, request.voice_name
+            )
+        else:
+            conditioning_latents = await loop.run_in_executor(
+                None, voice_profile_store.get_or_compute, tortoise_tts, request.voice_name
+            )
         
-        output_path = await save_audio_file(audio_data.cpu().numpy())
+        audio_data = await synthesize_cloned_voice(tortoise_tts, request.text, conditioning_latents, tortoise_preset)
+        output_path = await save_audio_file(audio_data, tortoise_sample_rate)
         
         return {
             "success": True,
             "audio_file": output_path,
             "voice_name": request.voice_name,
-            "samples_used": len(voice_samples)
+            "samples_used": len(voice_profile_store.sample_paths(request.voice_name))
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Voice cloning failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/voice/{voice_id}/synthesize")
+async def synthesize_cloned_speech(voice_id: str, request: VoiceSynthesisRequest):
+    """Synthesize with a previously cloned voice using its stored conditioning latents"""
+    try:
+        if not is_valid_voice_id(voice_id):
+            raise HTTPException(status_code=400, detail="Invalid voice id")
+        
+        loop = asyncio.get_event_loop()
+        conditioning_latents = await loop.run_in_executor(None, voice_profile_store.get, voice_id)
+        if conditioning_latents is None:
+            raise HTTPException(status_code=404, detail="Voice profile not found; clone the voice first")
+        
+        start_time = time.time()
+        tortoise_tts = await model_registry.aget("tortoise")
+        audio_data = await synthesize_cloned_voice(
+            tortoise_tts, clean_text_for_tts(request.text), conditioning_latents, request.preset
+        )
+        output_path = await save_audio_file(audio_data, tortoise_sample_rate)
+        
+        synthesis_time = time.time() - start_time
+        performance_metrics.record_request_time("/voice/synthesize", synthesis_time)
+        
+        return {
+            "success": True,
+            "audio_file": output_path,
+            "voice_id": voice_id,
+            "duration": len(audio_data) / tortoise_sample_rate,
+            "synthesis_time": synthesis_time
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Cloned voice synthesis failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+async def load_noise_profile(profile_id: Optional[str]):
+    """(noise_clip, sample_rate) for a stored profile, None without an id; 404 if the id is unknown"""
+    if not profile_id:
+        return None
+    if not is_valid_voice_id(profile_id):
+        raise HTTPException(status_code=400, detail="Invalid noise profile id")
+    loop = asyncio.get_event_loop()
+    noise_profile = await loop.run_in_executor(None, noise_profile_store.load, profile_id)
+    if noise_profile is None:
+        raise HTTPException(status_code=404, detail=f"Noise profile '{profile_id}' not found")
+    return noise_profile
+
+@app.post("/noise-profiles/{profile_id}")
+async def capture_noise_profile(profile_id: str, file: UploadFile = File(...), noise_only: bool = True):
+    """Capture a noise profile from a noise-only clip, or (noise_only=false) from a recording's quiet parts"""
+    if not is_valid_voice_id(profile_id):
+        raise HTTPException(status_code=400, detail="Profile id may only contain letters, digits, '-' and '_'")
+    
+    suffix = os.path.splitext(file.filename or "")[1]
+    temp_fd, temp_path = tempfile.mkstemp(suffix=suffix)
+    os.close(temp_fd)
+    try:
+        async with aiofiles.open(temp_path, 'wb') as f:
+            while True:
+                chunk = await file.read(upload_chunk_size)
+                if not chunk:
+                    break
+                await f.write(chunk)
+        
+        loop = asyncio.get_event_loop()
+        profile = await loop.run_in_executor(None, noise_profile_store.capture, profile_id, temp_path, noise_only)
+        return {"success": True, **profile}
+    
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Noise profile capture failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        os.unlink(temp_path)
+
+@app.get("/noise-profiles")
+async def list_noise_profiles():
+    """List stored noise profiles"""
+    return {"profiles": noise_profile_store.list_profiles()}
+
+@app.delete("/noise-profiles/{profile_id}")
+async def delete_noise_profile(profile_id: str):
+    if not is_valid_voice_id(profile_id) or not noise_profile_store.delete(profile_id):
+        raise HTTPException(status_code=404, detail=f"Noise profile '{profile_id}' not found")
+    return {"success": True}
+
+@app.get("/voices")
+async def list_voice_profiles():
+    """List cloned voices that have stored conditioning profiles"""
+    return {"voices": voice_profile_store.list_profiles()}
+
+async def synthesize_cloned_voice(tortoise_tts, text: str, conditioning_latents, preset: str) -> np.ndarray:
+    """Run Tortoise with precomputed conditioning latents off the event loop"""
+    loop = asyncio.get_event_loop()
+    async with await performance_optimizer.get_connection():
+        audio_tensor = await loop.run_in_executor(
+            None,
+            lambda: tortoise_tts.tts_with_preset(
+                text,
+                conditioning_latents=conditioning_latents,
+                preset=preset
+            )
+        )
+    return audio_tensor.squeeze().cpu().numpy().astype(AUDIO_DTYPE)
+
 @app.post("/audio/process")
 async def process_audio(file: UploadFile = File(...), params: str = None):
     """Process uploaded audio file with enhancements"""
@@ -654,46 +1386,60 @@ async def process_audio(file: UploadFile = File(...), params: str = None):
         else:
             audio_params = AudioProcessRequest()
         
-        # Save uploaded file
-        with tempfile.NamedTemporaryFile(delete=False) as temp_file:
-            content = await file.read()
-            temp_file.write(content)
-            temp_path = temp_file.name
-        
-        # Load audio
-        audio_data, sample_rate = librosa.load(temp_path, sr=None)
-        
-        # Apply processing
-        if audio_params.remove_noise or audio_params.enhance_audio:
-            audio_data = enhance_audio(audio_data, sample_rate)
-        
-        if audio_params.normalize:
-            audio_data = librosa.util.normalize(audio_data)
-        
-        if audio_params.add_effects and audio_params.effects:
-            # Apply custom effects based on parameters
-            effects = []
-            if audio_params.effects.get("reverb"):
-                effects.append(Reverb(room_size=0.5))
-            if audio_params.effects.get("chorus"):
-                effects.append(Chorus())
-            if audio_params.effects.get("compressor"):
-                effects.append(Compressor())
+        if not audio_denoiser:
+            raise HTTPException(status_code=500, detail="Audio processor not initialized")
+        check_output_format(audio_params.output_format, audio_params.bitrate)
+        
+        # A stored noise profile replaces per-file estimation of the noise floor
+        noise_profile = await load_noise_profile(audio_params.noise_profile_id)
+        noise_clip, noise_sample_rate = noise_profile or (None, None)
+        
+        # Stream the upload to disk in bounded chunks
+        suffix = os.path.splitext(file.filename or "")[1]
+        temp_fd, temp_path = tempfile.mkstemp(suffix=suffix)
+        os.close(temp_fd)
+        try:
+            async with aiofiles.open(temp_path, 'wb') as f:
+                while True:
+                    chunk = await file.read(upload_chunk_size)
+                    if not chunk:
+                        break
+                    await f.write(chunk)
             
-            if effects:
-                board = Pedalboard(effects)
-                audio_data = board(audio_data, sample_rate)
-        
-        # Save processed audio
-        output_path = await save_audio_file(audio_data, sample_rate)
-        
-        # Clean up
-        os.unlink(temp_path)
+            # Denoise in overlapping windows on the process pool, then enhance,
+            # normalize and apply effects while streaming to the output file
+            output_path = os.path.join("outputs", generate_unique_filename("wav"))
+            effects = build_effects(audio_params.effects) if audio_params.add_effects and audio_params.effects else None
+            enhance = audio_params.remove_noise or audio_params.enhance_audio
+            
+            loop = asyncio.get_event_loop()
+            work_dir = f"{output_path}.work"
+            # Output and intermediates live under outputs/; keep quota GC off them while rendering
+            with output_store.pinned([output_path, work_dir], f"render:{output_path}"):
+                result = await loop.run_in_executor(
+                    None,
+                    lambda: audio_denoiser.process_file(
+                        temp_path,
+                        output_path,
+                        denoise=enhance,
+                        enhance_plugins=enhancement_plugins() if enhance else None,
+                        normalize=audio_params.normalize,
+                        effects=effects,
+                        noise_clip=noise_clip,
+                        noise_sample_rate=noise_sample_rate,
+                        work_dir=work_dir
+                    )
+                )
+        finally:
+            # Clean up
+            os.unlink(temp_path)
+        output_store.record(output_path)
         
-        return {
+        response = {
             "success": True,
             "processed_file": output_path,
-            "original_duration": len(audio_data) / sample_rate,
+            "original_duration": result["duration"],
+            "noise_profile": result["noise_profile"],
             "processing_applied": {
                 "noise_reduction": audio_params.remove_noise,
                 "enhancement": audio_params.enhance_audio,
@@ -701,7 +1447,10 @@ async def process_audio(file: UploadFile = File(...), params: str = None):
                 "effects": audio_params.add_effects
             }
         }
+        return with_encoding(response, audio_params.output_format, audio_params.bitrate, key="processed_file")
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Audio processing failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -709,6 +1458,7 @@ async def process_audio(file: UploadFile = File(...), params: str = None):
 @app.post("/podcast/generate")
 async def generate_complete_podcast(background_tasks: BackgroundTasks, request: PodcastGenerationRequest):
     """Generate complete podcast episode (background task)"""
+    check_output_format(request.tts_params.output_format, request.tts_params.bitrate)
     try:
         task_id = str(uuid.uuid4())
         
@@ -781,9 +1531,18 @@ async def process_podcast_generation(task_id: str, request: PodcastGenerationReq
         )
         
         # Convert to speech
-        tts_request = TTSRequest(text=script_content, **request.tts_params.dict())
-        tts_response = await synthesize_speech(tts_request)
-        audio_file = tts_response["audio_file"]
+        tts_request = request.tts_params.copy(update={"text": script_content})
+        if request.audio_params.enhance_audio:
+            # Keep the waveform in memory through enhancement and write it once
+            audio_data, sample_rate = await synthesize_speech_waveform(
+                tts_request, clean_text_for_tts(script_content)
+            )
+        else:
+            tts_response = await synthesize_speech(tts_request)
+            audio_file = tts_response["audio_file"]
+            duration = tts_response.get("duration", 0)
+            # Hold the result for as long as the task record that points at it
+            output_store.pin(audio_file, f"task:{task_id}", ttl=3600)
         
         # Update progress: Audio processing (90%)
         redis_client.setex(
@@ -798,10 +1557,24 @@ async def process_podcast_generation(task_id: str, request: PodcastGenerationReq
         
         # Process audio if requested
         if request.audio_params.enhance_audio:
-            # Load and enhance audio
-            audio_data, sample_rate = sf.read(audio_file)
-            enhanced_audio = enhance_audio(audio_data, sample_rate)
+            loop = asyncio.get_event_loop()
+            noise_clip = None
+            noise_profile = await load_noise_profile(request.audio_params.noise_profile_id)
+            if noise_profile:
+                noise_clip = resampler.resample(noise_profile[0], noise_profile[1], sample_rate)
+            enhanced_audio = await loop.run_in_executor(None, enhance_audio, audio_data, sample_rate, noise_clip)
             audio_file = await save_audio_file(enhanced_audio, sample_rate)
+            duration = len(enhanced_audio) / sample_rate
+            output_store.pin(audio_file, f"task:{task_id}", ttl=3600)
+        
+        # Encode the requested rendition before reporting completion
+        encoded_file = None
+        if request.tts_params.output_format != "wav":
+            encoded_file = await audio_encoder.encode(
+                audio_file, request.tts_params.output_format, request.tts_params.bitrate
+            )
+            output_store.record(encoded_file)
+            output_store.pin(encoded_file, f"task:{task_id}", ttl=3600)
         
         # Complete
         redis_client.setex(
@@ -812,9 +1585,10 @@ async def process_podcast_generation(task_id: str, request: PodcastGenerationReq
                 "progress": 100,
                 "result": {
                     "audio_file": audio_file,
+                    "encoded_file": encoded_file,
                     "script": script_content,
-                    "duration": tts_response.get("duration", 0),
-                    "metadata": script_response["metadata"]
+                    "duration": duration,
+                    "metadata": script_response.get("metadata", {})
                 },
                 "completed_at": datetime.now().isoformat()
             })
@@ -834,22 +1608,76 @@ async def process_podcast_generation(task_id: str, request: PodcastGenerationReq
 
 # File serving endpoint
 @app.get("/outputs/{filename}")
-async def serve_audio_file(filename: str):
-    """Serve generated audio files"""
+async def serve_audio_file(filename: str, request: Request, format: Optional[str] = None,
+                           bitrate: str = "standard"):
+    """Serve generated audio files
+    
+    For a WAV master the format is ``?format=`` or, failing that, negotiated from
+    the Accept header: the master itself whenever it is listed (or ffmpeg is
+    missing), otherwise audio/ogg -> Opus, audio/mpeg -> MP3. Missing renditions
+    are encoded on first request. Responses carry a content-hash ETag, answer
+    If-None-Match with 304 and honour single byte ranges for seeking.
+    """
     try:
-        file_path = os.path.join("outputs", filename)
+        file_path = os.path.join("outputs", os.path.basename(filename))
         if not os.path.exists(file_path):
+            if is_rendering_master(file_path):
+                raise HTTPException(status_code=409, detail="Audio is still rendering; try again when the stream is complete")
             raise HTTPException(status_code=404, detail="File not found")
         
-        return FileResponse(
-            path=file_path,
-            media_type="audio/wav",
-            filename=filename
+        if file_path.endswith(".wav"):
+            output_format = format or negotiate_format(request.headers.get("accept"), audio_encoder.formats)
+            check_output_format(output_format, bitrate)
+            file_path = await audio_encoder.encode(file_path, output_format, bitrate)
+        output_store.touch(file_path)
+        
+        return await serve_file(
+            request,
+            file_path,
+            media_type_for(file_path),
+            output_hash_cache,
+            headers={"Vary": "Accept"}
         )
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"File serving failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/streams/{stream_id}")
+async def stream_status(stream_id: str):
+    """Progress of a segmented stream: live while rendering, complete once the playlist is final"""
+    stream = stream_packager.describe(stream_id)
+    if stream is None or stream["protocol"] is None:
+        raise HTTPException(status_code=404, detail="Stream not found")
+    return {**stream_info(stream_id, stream["protocol"]), **stream}
+
+@app.get("/streams/{stream_id}/{filename}")
+async def serve_stream_file(stream_id: str, filename: str, request: Request):
+    """Serve a stream's playlist/manifest (revalidated) or one of its segments (immutable)"""
+    try:
+        if not is_valid_stream_id(stream_id):
+            raise HTTPException(status_code=404, detail="Stream not found")
+        file_path = os.path.join(stream_packager.stream_dir(stream_id), os.path.basename(filename))
+        if not os.path.exists(file_path):
+            raise HTTPException(status_code=404, detail="File not found")
+        
+        output_store.touch(file_path)
+        
+        # The playlist grows while the stream is live; published segments never change
+        return await serve_file(
+            request,
+            file_path,
+            stream_media_type(file_path),
+            output_hash_cache,
+            immutable=not file_path.endswith((".m3u8", ".mpd"))
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Stream file serving failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/batch/process")
 async def batch_process(requests: List[dict]):
     """Process multiple requests in batch for better performance"""
@@ -876,22 +1704,23 @@ async def batch_process(requests: List[dict]):
                 else:
                     results.append({"success": True, "data": result, "request_id": script_requests[i].get('id')})
         
-        # Process TTS requests concurrently (with connection pooling)
+        # Process TTS requests concurrently, at most batch_tts_concurrency at a time; their
+        # Coqui sentences are micro-batched onto the engine, but Tortoise and the
+        # in-process fallback have no worker pool bounding them
         if tts_requests:
+            tts_slots = asyncio.Semaphore(batch_tts_concurrency)
+            
+            async def limited_synthesis(tts_req: TTSRequest):
+                async with tts_slots:
+                    return await synthesize_speech(tts_req)
+            
             tts_tasks = []
             for req in tts_requests:
                 tts_req = TTSRequest(**req['data'])
-                task = synthesize_speech(tts_req)
+                task = limited_synthesis(tts_req)
                 tts_tasks.append(task)
             
-            # Limit concurrent TTS requests to avoid overwhelming the system
-            batch_size = 3
-            tts_results = []
-            
-            for i in range(0, len(tts_tasks), batch_size):
-                batch = tts_tasks[i:i + batch_size]
-                batch_results = await asyncio.gather(*batch, return_exceptions=True)
-                tts_results.extend(batch_results)
+            tts_results = await asyncio.gather(*tts_tasks, return_exceptions=True)
             
             for i, result in enumerate(tts_results):
                 if isinstance(result, Exception):
@@ -917,21 +1746,14 @@ async def generate_music_endpoint(request: MusicRequest):
         if not music_generator:
             raise HTTPException(status_code=500, detail="Music generator not initialized")
         
-        if request.style == "ambient":
-            music_path = music_generator.generate_ambient_music(request.duration, request.volume)
-        elif request.style == "upbeat":
-            music_path = music_generator.generate_upbeat_music(request.duration, request.volume)
-        elif request.style == "relaxing":
-            music_path = music_generator.generate_relaxing_music(request.duration, request.volume)
-        else:
-            music_path = music_generator.generate_ambient_music(request.duration, request.volume)
-        
-        # Apply fades if requested
-        if request.fade_in or request.fade_out:
-            import soundfile as sf
-            audio_data, sample_rate = sf.read(music_path)
-            audio_data = music_generator.apply_fade(audio_data, request.fade_in, request.fade_out)
-            sf.write(music_path, audio_data, sample_rate)
+        # Unknown styles fall back to ambient; fades are applied while the bed is written
+        loop = asyncio.get_event_loop()
+        music_path = await loop.run_in_executor(
+            None,
+            music_generator.generate_music,
+            request.style, request.duration, request.volume, request.fade_in, request.fade_out
+        )
+        output_store.record(music_path)
         
         return {
             "success": True,
@@ -947,37 +1769,49 @@ async def generate_music_endpoint(request: MusicRequest):
 @app.post("/tts/multi-speaker")
 async def synthesize_multi_speaker(request: MultiSpeakerTTSRequest):
     """Generate TTS with multiple speakers"""
+    check_output_format(request.output_format, request.bitrate)
     try:
         if not multi_speaker_processor:
             raise HTTPException(status_code=500, detail="Multi-speaker processor not initialized")
         
         # Process segments with different speakers
-        audio_path = await multi_speaker_processor.synthesize_multi_speaker(
+        result = await multi_speaker_processor.synthesize_multi_speaker(
             request.segments, 
             output_dir
         )
+        output_store.record(result["audio_file"])
         
-        return {
+        response = {
             "success": True,
-            "audio_file": audio_path,
+            "audio_file": result["audio_file"],
             "num_speakers": len(set(seg["speaker"] for seg in request.segments)),
-            "total_segments": len(request.segments)
+            "total_segments": len(request.segments),
+            "failed_segments": result["failed_segments"]
         }
+        return with_encoding(response, request.output_format, request.bitrate)
         
     except Exception as e:
         logger.error(f"Multi-speaker TTS failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/podcast/full-production")
-async def create_full_podcast_production(request: PodcastProductionRequest):
-    """Create a complete podcast with multiple speakers and music"""
+async def create_full_podcast_production(request: PodcastProductionRequest, background_tasks: BackgroundTasks):
+    """Create a complete podcast with multiple speakers and music
+    
+    With ``stream_protocol`` the mix renders in the background into an HLS/DASH
+    stream and the response returns its playlist URL as soon as mixing starts.
+    """
+    if request.stream_protocol:
+        check_stream_protocol(request.stream_protocol, request.bitrate)
+    else:
+        check_output_format(request.output_format, request.bitrate)
     try:
         start_time = time.time()
         
         # Step 1: Generate script with multi-speaker awareness
         script_content = await async_groq_request(
             create_multi_speaker_prompt(request.script_params), 
-            "llama-3.1-8b-instant"
+            script_model
         )
         
         # Step 2: Parse script for multiple speakers
@@ -990,67 +1824,128 @@ async def create_full_podcast_production(request: PodcastProductionRequest):
         )
         
         # Step 3: Generate multi-speaker audio
-        voice_audio_path = await multi_speaker_processor.synthesize_multi_speaker(
+        # Kept in memory: the render graph below is the only encode
+        voice_result = await multi_speaker_processor.synthesize_multi_speaker(
             speaker_segments, 
-            output_dir
+            output_dir,
+            write_output=audio_mixer is None
         )
         
         # Step 4: Generate music tracks
         music_files = {}
         
-        if request.intro_music:
-            music_files["intro"] = music_generator.generate_upbeat_music(
-                request.intro_music.duration, 
-                request.intro_music.volume
-            )
-        
-        if request.outro_music:
-            music_files["outro"] = music_generator.generate_upbeat_music(
-                request.outro_music.duration, 
-                request.outro_music.volume
-            )
-        
-        if request.background_music:
-            music_files["background"] = music_generator.generate_ambient_music(
-                request.background_music.duration, 
-                request.background_music.volume
-            )
-        
-        # Step 5: Create final production mix
-        if request.final_mix and audio_mixer:
-            final_audio_path = await audio_mixer.create_full_production(
-                voice_audio_path,
-                music_files.get("intro"),
-                music_files.get("outro"),
-                music_files.get("background")
+        loop = asyncio.get_event_loop()
+        music_tracks = [
+            ("intro", "upbeat", request.intro_music),
+            ("outro", "upbeat", request.outro_music),
+            ("background", "ambient", request.background_music)
+        ]
+        for name, style, music_request in music_tracks:
+            if music_request:
+                music_files[name] = output_store.record(await loop.run_in_executor(
+                    None, music_generator.generate_music, style, music_request.duration, music_request.volume
+                ))
+        
+        # Step 5: Mix, enhance and apply effects in one pass over the audio
+        stream = None
+        if audio_mixer:
+            mix_args = dict(
+                intro_music=music_files.get("intro") if request.final_mix else None,
+                outro_music=music_files.get("outro") if request.final_mix else None,
+                background_music=music_files.get("background") if request.final_mix else None,
+                sample_rate=voice_result["sample_rate"],
+                enhance=True,
+                effects=build_effects(request.effects)
             )
+            if request.stream_protocol:
+                # Segments are published as the mix renders; the WAV master lands when it
+                # finishes, and /outputs answers 409 for it until then
+                stream_id = uuid.uuid4().hex
+                final_audio_path = os.path.join(output_dir, f"full_production_{stream_id}.wav")
+                writer = stream_packager.open(
+                    stream_id, voice_result["sample_rate"], request.stream_protocol, request.bitrate
+                )
+                background_tasks.add_task(package_stream, writer, audio_mixer.create_full_production(
+                    voice_result["audio"], output_file=final_audio_path, segment_writer=writer, **mix_args
+                ), [final_audio_path, partial_path(final_audio_path)] + list(music_files.values()))
+                stream = stream_info(stream_id, request.stream_protocol)
+            else:
+                final_audio_path = os.path.join(
+                    output_dir, f"full_production_{int(time.time())}_{uuid.uuid4().hex[:8]}.wav"
+                )
+                render_inputs = [final_audio_path, partial_path(final_audio_path)] + list(music_files.values())
+                with output_store.pinned(render_inputs, f"render:{final_audio_path}"):
+                    await audio_mixer.create_full_production(
+                        voice_result["audio"], output_file=final_audio_path, **mix_args
+                    )
         else:
-            final_audio_path = voice_audio_path
-        
-        # Step 6: Enhance audio quality
-        if audio_mixer:
-            final_audio_path = audio_mixer.enhance_audio_quality(final_audio_path)
+            final_audio_path = voice_result["audio_file"]
+        if not stream:
+            output_store.record(final_audio_path)
         
         production_time = time.time() - start_time
         
-        return {
+        response = {
             "success": True,
             "script": script_content,
             "audio_file": final_audio_path,
             "production_details": {
                 "num_speakers": request.script_params.num_speakers,
-                "segments_generated": len(speaker_segments),
+                "segments_generated": voice_result["segments_rendered"],
+                "failed_segments": voice_result["failed_segments"],
                 "music_tracks": list(music_files.keys()),
                 "final_mix": request.final_mix,
                 "production_time": production_time
             },
             "music_files": music_files
         }
+        if stream:
+            return {**response, "stream": stream}
+        return with_encoding(response, request.output_format, request.bitrate)
         
     except Exception as e:
         logger.error(f"Full production failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def build_script_prompt(request: ScriptRequest) -> str:
+    """Create prompt for single-speaker podcast script"""
+    return f"""
+    You are creating audio content that will be read by a text-to-speech system. Write ONLY the spoken words that should be heard by listeners.
+
+    Topic: {request.topic}
+    Duration: {request.duration_minutes} minutes
+    Style: {request.style}
+    Tone: {request.tone}
+
+    CRITICAL RULES - DO NOT INCLUDE:
+    ❌ NO episode titles, headings, or section labels
+    ❌ NO timestamps like [0:00] or (2:15)
+    ❌ NO stage directions like [music plays] or [pause]
+    ❌ NO speaker labels like "HOST:" or "NARRATOR:"
+    ❌ NO markdown formatting like **bold** or *italics*
+    ❌ NO bullet points or numbered lists
+    ❌ NO sound effects descriptions
+    ❌ NO technical instructions or notes
+
+    WRITE ONLY:
+    ✅ Natural, conversational speech
+    ✅ Complete sentences with proper punctuation
+    ✅ Direct address to the listener ("you", "we", "let's")
+    ✅ Smooth transitions between ideas
+    ✅ Rhetorical questions to engage listeners
+
+    {'✅ Start with an engaging hook' if request.include_intro else ''}
+    {'✅ End with a memorable conclusion' if request.include_outro else ''}
+
+    Example of what TO write:
+    "Welcome to today's discussion about technology. Have you ever wondered how artificial intelligence is changing our daily lives? Let's explore this fascinating topic together..."
+
+    Example of what NOT to write:
+    "**Welcome to TechTalk!** [upbeat music] HOST: Today we're discussing... [00:30]"
+
+    Now write {request.duration_minutes} minutes of natural speech about {request.topic} in a {request.style} {request.tone} style:
+    """
+
 def create_multi_speaker_prompt(params: ScriptRequest) -> str:
     """Create prompt for multi-speaker podcast script"""
     return f"""
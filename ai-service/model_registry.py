@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Model Registry for AI Service
+Lazy model loading with per-model locks, memory-aware LRU eviction and pinned warm models
+"""
+
+import os
+import gc
+import time
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+
+def _process_rss() -> int:
+    return psutil.Process(os.getpid()).memory_info().rss
+
+
+class ModelRegistry:
+    """Load models on first use and keep resident ones under an RSS budget.
+
+    Each model has its own lock, so concurrent first requests wait for a single
+    load instead of loading twice, while other models stay available. Resident
+    memory per model is measured as the process RSS growth across its load. When
+    the total exceeds the budget, least recently used models that are not pinned
+    are dropped; callers still holding a reference keep theirs alive until done.
+    """
+
+    def __init__(self, memory_budget_bytes: int, pinned: Iterable[str] = ()):
+        self.memory_budget_bytes = memory_budget_bytes
+        self.pinned = set(pinned)
+        self.evictions = 0
+
+        self._loaders: Dict[str, Callable[[], Any]] = {}
+        self._models = OrderedDict()  # name -> entry dict, least recently used first
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, loader: Callable[[], Any], pinned: bool = False):
+        """Declare how to load ``name``; nothing is loaded until it is requested"""
+        with self._lock:
+            self._loaders.setdefault(name, loader)
+            self._load_locks.setdefault(name, threading.Lock())
+            if pinned:
+                self.pinned.add(name)
+
+    def get(self, name: str) -> Any:
+        """Return the model, loading it if needed (blocking; see ``aget``)"""
+        model = self._touch(name)
+        if model is not None:
+            return model
+
+        with self._lock:
+            if name not in self._loaders:
+                raise KeyError(f"Unknown model: {name}")
+            load_lock = self._load_locks[name]
+
+        with load_lock:
+            # Another caller may have finished loading while we waited
+            model = self._touch(name)
+            if model is not None:
+                return model
+
+            logger.info(f"Loading model: {name}")
+            rss_before = _process_rss()
+            start_time = time.time()
+            model = self._loaders[name]()
+            load_time = time.time() - start_time
+            memory_bytes = max(0, _process_rss() - rss_before)
+
+            with self._lock:
+                now = time.time()
+                self._models[name] = {
+                    "model": model,
+                    "memory_bytes": memory_bytes,
+                    "load_time": load_time,
+                    "loaded_at": now,
+                    "last_used": now,
+                    "uses": 1
+                }
+                self._evict_over_budget(keep=name)
+
+            logger.info(f"Loaded model {name} in {load_time:.1f}s (~{memory_bytes / 1e6:.0f} MB)")
+            return model
+
+    async def aget(self, name: str) -> Any:
+        """Return the model without blocking the event loop while it loads"""
+        model = self._touch(name)
+        if model is not None:
+            return model
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, self.get, name)
+
+    def warm(self):
+        """Load every pinned model up front"""
+        for name in sorted(self.pinned):
+            if name in self._loaders:
+                try:
+                    self.get(name)
+                except Exception as e:
+                    logger.warning(f"Failed to warm model {name}: {e}")
+
+    def unload(self, name: str) -> bool:
+        with self._lock:
+            entry = self._models.pop(name, None)
+        if entry is None:
+            return False
+        del entry
+        gc.collect()
+        return True
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._models
+
+    def _touch(self, name: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._models.get(name)
+            if entry is None:
+                return None
+            entry["last_used"] = time.time()
+            entry["uses"] += 1
+            self._models.move_to_end(name)
+            return entry["model"]
+
+    def _evict_over_budget(self, keep: str):
+        """Drop LRU unpinned models until resident memory fits the budget (holds _lock)"""
+        total = sum(entry["memory_bytes"] for entry in self._models.values())
+        evicted = False
+        for name in list(self._models.keys()):
+            if total <= self.memory_budget_bytes:
+                break
+            if name == keep or name in self.pinned:
+                continue
+            entry = self._models.pop(name)
+            total -= entry["memory_bytes"]
+            self.evictions += 1
+            evicted = True
+            logger.info(f"Evicted model {name} to stay under memory budget")
+        if evicted:
+            gc.collect()
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            models = {
+                name: {
+                    "loaded": True,
+                    "pinned": name in self.pinned,
+                    "load_time": entry["load_time"],
+                    "memory_mb": entry["memory_bytes"] / 1e6,
+                    "loaded_at": entry["loaded_at"],
+                    "last_used": entry["last_used"],
+                    "uses": entry["uses"]
+                }
+                for name, entry in self._models.items()
+            }
+            for name in self._loaders:
+                if name not in models:
+                    models[name] = {"loaded": False, "pinned": name in self.pinned}
+            resident = sum(entry["memory_bytes"] for entry in self._models.values())
+
+        return {
+            "models": models,
+            "resident_model_memory_mb": resident / 1e6,
+            "memory_budget_mb": self.memory_budget_bytes / 1e6,
+            "process_rss_mb": _process_rss() / 1e6,
+            "evictions": self.evictions
+        }
+
+
+# Process-wide registry; TTS worker processes each get their own copy
+model_registry = ModelRegistry(
+    memory_budget_bytes=int(os.getenv("MODEL_MEMORY_BUDGET_MB", "4096")) * 1024 * 1024,
+    pinned=[name.strip() for name in os.getenv("PINNED_MODELS", "").split(",") if name.strip()]
+)
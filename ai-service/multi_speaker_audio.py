@@ -6,100 +6,209 @@ Adds support for multiple speakers and intro/outro music
 
 import numpy as np
 import soundfile as sf
-import librosa
 import os
 import time
+import uuid
+import asyncio
 import logging
-from typing import List, Dict, Any, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Callable, Awaitable, Tuple
+
+from pedalboard import Pedalboard, Compressor
+
+from audio_dtype import AUDIO_DTYPE, expect_float32
+from pitch_shift import pitch_shifter
+from resampling import resampler
 
 logger = logging.getLogger(__name__)
 
+def partial_path(path: str) -> str:
+    """Where a master is written while it renders; it is renamed to ``path`` once complete"""
+    return path + ".part"
+
+def assemble_segments(parts: List[Tuple[np.ndarray, float]], sample_rate: int) -> np.ndarray:
+    """Write (audio, pause_seconds) parts back to back into one preallocated float32 buffer.
+    
+    ``parts`` is emptied as segments are copied in, so each segment is freed as
+    soon as it lands in the output; together with the lazily committed zero
+    buffer this keeps peak memory near the size of the final audio.
+    """
+    pause_samples = [int(pause * sample_rate) for _, pause in parts]
+    total_samples = sum(len(audio) for audio, _ in parts) + sum(pause_samples)
+    output = np.zeros(total_samples, dtype=AUDIO_DTYPE)
+    
+    offset = 0
+    parts.reverse()
+    for pause in pause_samples:
+        audio, _ = parts.pop()
+        output[offset:offset + len(audio)] = expect_float32(audio, "multi-speaker segment")
+        offset += len(audio) + pause  # pauses are already silent
+        del audio
+    
+    return output
+
 class MusicGenerator:
-    """Generate background music for podcasts"""
+    """Generate background music for podcasts
     
-    def __init__(self, output_dir: str):
+    Each style is rendered once at unit gain as a short seamless loop: every
+    partial is rounded to a whole number of cycles per loop so the loop repeats
+    without clicks. Beds of any length and volume are produced by repeating the
+    loop and scaling the written blocks, so the cache holds one loop per style:
+    in memory and, with ``loop_cache_dir``, as memory-mapped .npy files shared
+    across restarts.
+    """
+    
+    # style -> loop length in seconds (partials are snapped to multiples of 1 / loop length)
+    LOOP_SECONDS = {"ambient": 2.0, "upbeat": 1.0, "relaxing": 4.0}
+    FADE_SECONDS = 0.5
+    BLOCK_SECONDS = 10.0
+    
+    def __init__(self, output_dir: str, loop_cache_dir: Optional[str] = None):
         self.output_dir = output_dir
         self.sample_rate = 22050
+        self.loop_cache_dir = loop_cache_dir
+        self._loops: Dict[str, np.ndarray] = {}
+        self._lock = threading.Lock()
+        if loop_cache_dir:
+            os.makedirs(loop_cache_dir, exist_ok=True)
+    
+    def _snap(self, freq: float, loop_seconds: float) -> float:
+        """Nearest frequency with a whole number of cycles per loop"""
+        return round(freq * loop_seconds) / loop_seconds
+    
+    def _render_loop(self, style: str) -> np.ndarray:
+        loop_seconds = self.LOOP_SECONDS[style]
+        n = np.arange(int(loop_seconds * self.sample_rate))
         
-    def generate_ambient_music(self, duration: float, volume: float = 0.3) -> str:
-        """Generate ambient background music"""
-        duration_samples = int(duration * self.sample_rate)
-        t = np.linspace(0, duration, duration_samples)
-        
-        # Layer multiple sine waves for ambient texture
-        freq1, freq2, freq3 = 220, 330, 440  # A3, E4, A4
-        wave1 = 0.3 * np.sin(2 * np.pi * freq1 * t)
-        wave2 = 0.2 * np.sin(2 * np.pi * freq2 * t)
-        wave3 = 0.1 * np.sin(2 * np.pi * freq3 * t)
+        def sine(freq: float, phase: float = 0.0) -> np.ndarray:
+            # Phase from each sample's exact integer position within its cycle, so
+            # float32 stays precise (and the loop seamless) however long the loop is
+            cycles = round(self._snap(freq, loop_seconds) * loop_seconds)
+            position = (n * cycles % len(n)).astype(AUDIO_DTYPE) / AUDIO_DTYPE(len(n))
+            return np.sin(AUDIO_DTYPE(2 * np.pi) * position + AUDIO_DTYPE(phase))
         
-        # Add gentle modulation
-        modulation = 0.1 * np.sin(2 * np.pi * 0.5 * t)
-        ambient_music = (wave1 + wave2 + wave3) * (1 + modulation) * volume
+        if style == "ambient":
+            # Layer multiple sine waves for ambient texture
+            freq1, freq2, freq3 = 220, 330, 440  # A3, E4, A4
+            waves = 0.3 * sine(freq1) + 0.2 * sine(freq2) + 0.1 * sine(freq3)
+            
+            # Add gentle modulation
+            modulation = 0.1 * sine(0.5)
+            loop = waves * (1 + modulation)
+        elif style == "upbeat":
+            # Rhythmic pattern at 2 beats per second under melody and harmony
+            beat_pattern = sine(2.0)
+            melody = 0.4 * sine(523)  # C5
+            harmony = 0.2 * sine(659)  # E5
+            loop = (melody + harmony) * (0.5 + 0.5 * np.abs(beat_pattern))
+        else:
+            # Soft pentatonic scale notes
+            freqs = [261.63, 293.66, 329.63, 392.00, 440.00]  # C, D, E, G, A
+            loop = np.zeros(len(n), dtype=AUDIO_DTYPE)
+            for i, freq in enumerate(freqs):
+                loop += 0.15 * sine(freq, i * 0.2)
         
-        return self._save_audio(ambient_music, "ambient")
+        return expect_float32(loop, "music loop")
     
-    def generate_upbeat_music(self, duration: float, volume: float = 0.4) -> str:
-        """Generate upbeat intro/outro music"""
-        duration_samples = int(duration * self.sample_rate)
-        t = np.linspace(0, duration, duration_samples)
+    def get_loop(self, style: str) -> np.ndarray:
+        """Return the cached seamless loop for ``style`` at unit gain (read-only)"""
+        with self._lock:
+            loop = self._loops.get(style)
+            if loop is not None:
+                return loop
+            
+            path = None
+            if self.loop_cache_dir:
+                path = os.path.join(self.loop_cache_dir, f"{style}_{self.sample_rate}.npy")
+            
+            if path and os.path.exists(path):
+                loop = np.load(path, mmap_mode="r")
+            else:
+                loop = self._render_loop(style)
+                if path:
+                    temp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp.npy"
+                    np.save(temp_path, loop)
+                    os.replace(temp_path, path)
+                loop.setflags(write=False)
+            
+            self._loops[style] = loop
+            return loop
+    
+    def generate_music(self, style: str, duration: float, volume: float,
+                       fade_in: bool = False, fade_out: bool = False) -> str:
+        """Write a music bed to a file block by block; memory stays constant with duration"""
+        if style not in self.LOOP_SECONDS:
+            style = "ambient"
         
-        # Create rhythmic pattern
-        beat_freq = 2.0  # 2 beats per second
-        beat_pattern = np.sin(2 * np.pi * beat_freq * t)
+        loop = self.get_loop(style)
+        total_samples = int(duration * self.sample_rate)
+        fade_samples = min(int(self.FADE_SECONDS * self.sample_rate), total_samples)
         
-        # Melody and harmony
-        melody = 0.4 * np.sin(2 * np.pi * 523 * t)  # C5
-        harmony = 0.2 * np.sin(2 * np.pi * 659 * t)  # E5
+        # Blocks are a whole number of loops, so every block starts at loop phase zero;
+        # the tiled block is a private copy, so the volume is applied to it in place
+        block = np.tile(loop, max(1, int(self.BLOCK_SECONDS * self.sample_rate) // len(loop)))
+        block *= AUDIO_DTYPE(volume)
         
-        upbeat_music = (melody + harmony) * (0.5 + 0.5 * np.abs(beat_pattern)) * volume
+        filepath = os.path.join(self.output_dir, f"music_{style}_{uuid.uuid4().hex}.wav")
+        with sf.SoundFile(filepath, "w", samplerate=self.sample_rate, channels=1, subtype="PCM_16") as out:
+            for start in range(0, total_samples, len(block)):
+                end = min(start + len(block), total_samples)
+                chunk = block[:end - start]
+                
+                if (fade_in and start < fade_samples) or (fade_out and end > total_samples - fade_samples):
+                    # Ramps cover only the faded samples, computed in float32
+                    chunk = chunk.copy()
+                    scale = AUDIO_DTYPE(max(1, fade_samples - 1))
+                    if fade_in and start < fade_samples:
+                        stop = min(end, fade_samples)
+                        chunk[:stop - start] *= np.arange(start, stop, dtype=AUDIO_DTYPE) / scale
+                    if fade_out and end > total_samples - fade_samples:
+                        lo = max(start, total_samples - fade_samples)
+                        remaining = np.arange(total_samples - 1 - lo, total_samples - 1 - end, -1, dtype=AUDIO_DTYPE)
+                        chunk[lo - start:] *= remaining / scale
+                
+                out.write(chunk)
         
-        return self._save_audio(upbeat_music, "upbeat")
+        logger.info(f"Generated {style} music: {filepath}")
+        return filepath
+    
+    def generate_ambient_music(self, duration: float, volume: float = 0.3) -> str:
+        """Generate ambient background music"""
+        return self.generate_music("ambient", duration, volume)
+    
+    def generate_upbeat_music(self, duration: float, volume: float = 0.4) -> str:
+        """Generate upbeat intro/outro music"""
+        return self.generate_music("upbeat", duration, volume)
     
     def generate_relaxing_music(self, duration: float, volume: float = 0.25) -> str:
         """Generate soft, relaxing music"""
-        duration_samples = int(duration * self.sample_rate)
-        t = np.linspace(0, duration, duration_samples)
-        
-        # Soft pentatonic scale notes
-        freqs = [261.63, 293.66, 329.63, 392.00, 440.00]  # C, D, E, G, A
-        relaxing_music = np.zeros_like(t)
-        
-        for i, freq in enumerate(freqs):
-            phase_offset = i * 0.2
-            wave = 0.15 * np.sin(2 * np.pi * freq * t + phase_offset)
-            relaxing_music += wave
-        
-        relaxing_music *= volume
-        
-        return self._save_audio(relaxing_music, "relaxing")
+        return self.generate_music("relaxing", duration, volume)
     
     def apply_fade(self, audio: np.ndarray, fade_in: bool = True, fade_out: bool = True) -> np.ndarray:
         """Apply fade in/out to audio"""
         if fade_in:
-            fade_samples = int(0.5 * self.sample_rate)  # 0.5 second fade
-            fade_in_curve = np.linspace(0, 1, fade_samples)
+            fade_samples = int(self.FADE_SECONDS * self.sample_rate)  # 0.5 second fade
+            fade_in_curve = np.linspace(0, 1, fade_samples, dtype=AUDIO_DTYPE)
             audio[:fade_samples] *= fade_in_curve
         
         if fade_out:
-            fade_samples = int(0.5 * self.sample_rate)
-            fade_out_curve = np.linspace(1, 0, fade_samples)
+            fade_samples = int(self.FADE_SECONDS * self.sample_rate)
+            fade_out_curve = np.linspace(1, 0, fade_samples, dtype=AUDIO_DTYPE)
             audio[-fade_samples:] *= fade_out_curve
         
         return audio
-    
-    def _save_audio(self, audio: np.ndarray, style: str) -> str:
-        """Save audio to file and return path"""
-        filename = f"music_{style}_{int(time.time())}.wav"
-        filepath = os.path.join(self.output_dir, filename)
-        sf.write(filepath, audio, self.sample_rate)
-        logger.info(f"Generated {style} music: {filepath}")
-        return filepath
 
 class MultiSpeakerProcessor:
     """Handle multiple speakers and voice variety"""
     
-    def __init__(self, tts_model):
+    def __init__(self, tts_model, synthesize_fn: Optional[Callable[[str, float, float], Awaitable[Tuple[np.ndarray, int]]]] = None,
+                 max_workers: int = 2):
         self.tts_model = tts_model
+        # Async (text, speed, pitch) -> (audio, sample_rate); defaults to the in-process model on a thread pool
+        self.synthesize_fn = synthesize_fn
+        self.max_workers = max(1, max_workers)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="multi-speaker")
         self.speaker_voices = {
             "speaker1": {"gender": "female", "speed": 1.0, "pitch": 0.0},
             "speaker2": {"gender": "male", "speed": 0.95, "pitch": -2.0},
@@ -137,201 +246,370 @@ class MultiSpeakerProcessor:
         logger.info(f"Parsed script into {len(segments)} segments for {num_speakers} speakers")
         return segments
     
-    async def synthesize_multi_speaker(self, segments: List[Dict[str, Any]], output_dir: str) -> str:
-        """Synthesize audio for multiple speakers and combine"""
-        audio_files = []
+    def _voice_config(self, segment: Dict[str, Any]) -> Dict[str, Any]:
+        """Voice settings for a segment; request segments may only carry a speaker number"""
+        if "voice_config" in segment:
+            return segment["voice_config"]
+        speaker_key = f"speaker{segment.get('speaker', 1)}"
+        return self.speaker_voices.get(speaker_key, self.speaker_voices["speaker1"])
+    
+    def _render_segment(self, text: str, speed: float, pitch: float) -> Tuple[np.ndarray, int]:
+        """Synthesize one segment with the in-process model (blocking)"""
+        wav = self.tts_model.tts(text=text, speed=speed)
+        audio_data = np.asarray(wav, dtype=AUDIO_DTYPE)
+        sample_rate = self.tts_model.synthesizer.output_sample_rate
         
-        for i, segment in enumerate(segments):
-            # Generate TTS for this segment
-            temp_file = os.path.join(output_dir, f"segment_{i}_{int(time.time())}.wav")
-            
-            try:
-                # Apply voice configuration
-                voice_config = segment["voice_config"]
-                
-                # Generate speech with specific voice settings
-                self.tts_model.tts_to_file(
-                    text=segment["text"],
-                    file_path=temp_file,
-                    speed=voice_config["speed"]
-                )
-                
-                # Load and process audio
-                audio_data, sample_rate = sf.read(temp_file)
-                
-                # Apply pitch modification if needed
-                if voice_config["pitch"] != 0.0:
-                    # Simple pitch shift (you might want to use more sophisticated methods)
-                    audio_data = librosa.effects.pitch_shift(
-                        audio_data, sr=sample_rate, n_steps=voice_config["pitch"]
-                    )
-                
-                # Add pause after speaker
-                pause_duration = segment["pause_after"]
-                pause_samples = int(pause_duration * sample_rate)
-                pause_audio = np.zeros(pause_samples)
-                
-                # Combine speech and pause
-                combined_audio = np.concatenate([audio_data, pause_audio])
-                
-                # Save processed segment
-                processed_file = os.path.join(output_dir, f"processed_segment_{i}.wav")
-                sf.write(processed_file, combined_audio, sample_rate)
-                
-                audio_files.append(processed_file)
-                
-                # Clean up temp file
-                if os.path.exists(temp_file):
-                    os.remove(temp_file)
-                    
-            except Exception as e:
-                logger.error(f"Failed to process segment {i}: {e}")
-                continue
+        # Apply pitch modification if needed
+        return pitch_shifter.shift(audio_data, sample_rate, pitch), sample_rate
+    
+    async def _synthesize_segment(self, segment: Dict[str, Any]) -> Tuple[np.ndarray, int]:
+        voice_config = self._voice_config(segment)
+        if self.synthesize_fn is not None:
+            return await self.synthesize_fn(segment["text"], voice_config["speed"], voice_config["pitch"])
         
-        # Combine all segments
-        return await self._combine_audio_files(audio_files, output_dir)
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            self._executor, self._render_segment, segment["text"], voice_config["speed"], voice_config["pitch"]
+        )
     
-    async def _combine_audio_files(self, audio_files: List[str], output_dir: str) -> str:
-        """Combine multiple audio files into one"""
-        if not audio_files:
-            raise ValueError("No audio files to combine")
+    async def synthesize_multi_speaker(self, segments: List[Dict[str, Any]], output_dir: str,
+                                       write_output: bool = True) -> Dict[str, Any]:
+        """Synthesize all segments concurrently and combine them in script order.
         
-        combined_audio = []
-        target_sample_rate = None
+        At most ``max_workers`` segments are in flight at once. Segments that fail
+        are left out of the audio and listed in ``failed_segments``. With
+        ``write_output=False`` the combined audio is returned in memory (``audio``,
+        ``sample_rate``) for a later render stage instead of being written.
+        """
+        loop = asyncio.get_event_loop()
+        slots = asyncio.Semaphore(self.max_workers)
         
-        for file_path in audio_files:
-            audio_data, sample_rate = sf.read(file_path)
-            
-            if target_sample_rate is None:
-                target_sample_rate = sample_rate
-            elif sample_rate != target_sample_rate:
-                # Resample if needed
-                audio_data = librosa.resample(audio_data, orig_sr=sample_rate, target_sr=target_sample_rate)
-            
-            combined_audio.append(audio_data)
-            
-            # Clean up individual files
-            os.remove(file_path)
+        async def process(segment: Dict[str, Any]) -> Tuple[np.ndarray, int]:
+            async with slots:
+                return await self._synthesize_segment(segment)
         
-        # Concatenate all audio
-        final_audio = np.concatenate(combined_audio)
+        start_time = time.time()
+        results = await asyncio.gather(*[process(segment) for segment in segments], return_exceptions=True)
         
-        # Save combined audio
-        output_file = os.path.join(output_dir, f"multi_speaker_audio_{int(time.time())}.wav")
-        sf.write(output_file, final_audio, target_sample_rate)
+        parts = []
+        sample_rates = []
+        failed_segments = []
+        for i, (segment, result) in enumerate(zip(segments, results)):
+            if isinstance(result, Exception):
+                logger.error(f"Failed to process segment {i}: {result}")
+                failed_segments.append({"index": i, "error": str(result)})
+            else:
+                audio_data, sample_rate = result
+                parts.append((audio_data, segment.get("pause_after", 0.8)))
+                sample_rates.append(sample_rate)
+        del results
         
-        logger.info(f"Combined {len(audio_files)} audio segments into {output_file}")
-        return output_file
+        if not parts:
+            raise ValueError(f"All {len(segments)} segments failed to synthesize")
+        
+        # Combine all segments
+        segments_rendered = len(sample_rates)
+        final_audio, sample_rate = await loop.run_in_executor(
+            self._executor, self._combine_segments, parts, sample_rates
+        )
+        logger.info(f"Synthesized {segments_rendered}/{len(segments)} segments in {time.time() - start_time:.2f}s")
+        
+        result = {
+            "segments_rendered": segments_rendered,
+            "failed_segments": failed_segments
+        }
+        if write_output:
+            output_file = os.path.join(output_dir, f"multi_speaker_audio_{int(time.time())}_{uuid.uuid4().hex[:8]}.wav")
+            await loop.run_in_executor(self._executor, sf.write, output_file, final_audio, sample_rate)
+            logger.info(f"Combined {segments_rendered} audio segments into {output_file}")
+            result["audio_file"] = output_file
+        else:
+            result["audio"] = final_audio
+            result["sample_rate"] = sample_rate
+        return result
+    
+    def _combine_segments(self, parts: List[Tuple[np.ndarray, float]],
+                          sample_rates: List[int]) -> Tuple[np.ndarray, int]:
+        """Assemble (audio, pause_after) parts into one waveform in order (blocking)"""
+        target_sample_rate = sample_rates[0]
+        for i, sample_rate in enumerate(sample_rates):
+            if sample_rate != target_sample_rate:
+                # Resample if needed
+                audio_data, pause = parts[i]
+                parts[i] = (resampler.resample(audio_data, sample_rate, target_sample_rate), pause)
+        
+        return assemble_segments(parts, target_sample_rate), target_sample_rate
+
+class _LoopingTrack:
+    """Sequential reader that wraps around to the start of a track at EOF
+    
+    A track at another sample rate is looped at its own rate and fed through one
+    streaming resampler, so the loop seam stays continuous and memory constant.
+    """
+    
+    def __init__(self, path: str, target_sr: int):
+        self._file = sf.SoundFile(path)
+        self.length = self._file.frames
+        if self.length == 0:
+            self._file.close()
+            raise ValueError(f"Cannot loop empty track: {path}")
+        self._stream_context = None
+        self._stream = None
+        self._pending = np.zeros(0, dtype=np.float32)
+        if self._file.samplerate != target_sr:
+            self._stream_context = resampler.stream(self._file.samplerate, target_sr)
+            self._stream = self._stream_context.__enter__()
+    
+    def _read_source(self, frames: int) -> np.ndarray:
+        out = np.empty(frames, dtype=np.float32)
+        filled = 0
+        while filled < frames:
+            chunk = self._file.read(frames - filled, dtype="float32", out=out[filled:])
+            filled += len(chunk)
+            if self._file.tell() >= self.length:
+                self._file.seek(0)
+        return out
+    
+    def read(self, frames: int) -> np.ndarray:
+        if self._stream is None:
+            return self._read_source(frames)
+        
+        while len(self._pending) < frames:
+            resampled = self._stream.resample_chunk(self._read_source(resampler.chunk_size))
+            self._pending = np.concatenate([self._pending, resampled])
+        out, self._pending = self._pending[:frames], self._pending[frames:]
+        return out
+    
+    def close(self):
+        self._file.close()
+        if self._stream_context is not None:
+            self._stream_context.__exit__(None, None, None)
 
 class AudioMixer:
-    """Mix voice, music, and create final production"""
+    """Mix voice, music, and create final production
     
-    def __init__(self, output_dir: str):
+    The production is rendered in fixed-size blocks straight from the inputs to
+    the output file, so memory stays constant however long the episode is.
+    Intro and outro stings are short and held in memory; the voice and the looped
+    background bed are streamed.
+    
+    Each block runs through one render graph, so mixing and enhancement share a
+    single encode: mix -> gain (peak normalization) -> noise gate -> compressor
+    -> optional effects -> clip. The peak is measured in a first, mix-only pass.
+    """
+    
+    def __init__(self, output_dir: str, block_size: int = 65536):
         self.output_dir = output_dir
+        self.block_size = block_size
+    
+    def _load_track(self, path: str, target_sr: int) -> np.ndarray:
+        audio, sample_rate = sf.read(path, dtype="float32")
+        if sample_rate != target_sr:
+            audio = resampler.resample(audio, sample_rate, target_sr)
+        return audio
+    
+    def _plan(self, voice, sample_rate: Optional[int], intro_music: Optional[str], outro_music: Optional[str],
+              background_music: Optional[str]) -> Dict[str, Any]:
+        """Lay out the timeline: the intro's last second overlaps the voice, the outro's first second its end"""
+        if isinstance(voice, np.ndarray):
+            target_sr, voice_length = sample_rate, len(expect_float32(voice, "mixer voice"))
+        else:
+            voice_info = sf.info(voice)
+            target_sr, voice_length = voice_info.samplerate, voice_info.frames
+        crossfade_samples = int(1.0 * target_sr)  # 1 second crossfades
+        
+        intro_audio = None
+        if intro_music and os.path.exists(intro_music):
+            intro_audio = self._load_track(intro_music, target_sr)
+        outro_audio = None
+        if outro_music and os.path.exists(outro_music):
+            outro_audio = self._load_track(outro_music, target_sr)
+        
+        voice_start = max(0, len(intro_audio) - crossfade_samples) if intro_audio is not None else 0
+        voice_end = voice_start + voice_length
+        total_length = voice_end
+        outro_start = voice_end
+        if outro_audio is not None:
+            outro_start = max(0, voice_end - crossfade_samples)
+            total_length = outro_start + len(outro_audio)
+        
+        return {
+            "voice": voice,
+            "sample_rate": target_sr,
+            "crossfade_samples": crossfade_samples,
+            "intro": intro_audio,
+            "intro_crossfade": intro_audio is not None and len(intro_audio) > crossfade_samples,
+            "outro": outro_audio,
+            "outro_crossfade": (outro_audio is not None and len(outro_audio) > crossfade_samples
+                                and voice_end > crossfade_samples),
+            "background": background_music if background_music and os.path.exists(background_music) else None,
+            "voice_start": voice_start,
+            "voice_end": voice_end,
+            "outro_start": outro_start,
+            "total_length": total_length
+        }
     
-    async def create_full_production(self, voice_file: str, intro_music: str = None, 
-                                   outro_music: str = None, background_music: str = None) -> str:
-        """Create full podcast production with intro, voice, and outro"""
+    def _iter_mix(self, plan: Dict[str, Any]):
+        """Yield the mixed production block by block"""
+        cf = plan["crossfade_samples"]
+        voice_start, voice_end = plan["voice_start"], plan["voice_end"]
+        outro_start, total_length = plan["outro_start"], plan["total_length"]
+        intro, outro = plan["intro"], plan["outro"]
+        
+        # The voice is either a file streamed from disk or audio already in memory
+        voice = plan["voice"]
+        voice_file = None if isinstance(voice, np.ndarray) else sf.SoundFile(voice)
+        background = None
+        if plan["background"]:
+            background = _LoopingTrack(plan["background"], plan["sample_rate"])
+        
         try:
-            # Load voice audio
-            voice_audio, voice_sr = sf.read(voice_file)
-            final_audio = voice_audio
-            target_sr = voice_sr
-            
-            # Add intro music
-            if intro_music and os.path.exists(intro_music):
-                intro_audio, intro_sr = sf.read(intro_music)
-                if intro_sr != target_sr:
-                    intro_audio = librosa.resample(intro_audio, orig_sr=intro_sr, target_sr=target_sr)
-                
-                # Crossfade intro with voice
-                crossfade_samples = int(1.0 * target_sr)  # 1 second crossfade
+            for start in range(0, total_length, self.block_size):
+                end = min(start + self.block_size, total_length)
+                block = np.zeros(end - start, dtype=AUDIO_DTYPE)
                 
-                if len(intro_audio) > crossfade_samples:
-                    # Fade out intro over voice beginning
-                    fade_out = np.linspace(1, 0.2, crossfade_samples)
-                    fade_in = np.linspace(0.2, 1, crossfade_samples)
-                    
-                    intro_audio[-crossfade_samples:] *= fade_out
-                    voice_audio[:crossfade_samples] *= fade_in
-                    voice_audio[:crossfade_samples] += intro_audio[-crossfade_samples:] * 0.3
+                # Intro before the voice
+                if start < voice_start:
+                    stop = min(end, voice_start)
+                    block[:stop - start] = intro[start:stop]
                 
-                final_audio = np.concatenate([intro_audio[:-crossfade_samples], voice_audio])
-            
-            # Add background music
-            if background_music and os.path.exists(background_music):
-                bg_audio, bg_sr = sf.read(background_music)
-                if bg_sr != target_sr:
-                    bg_audio = librosa.resample(bg_audio, orig_sr=bg_sr, target_sr=target_sr)
+                # Voice, faded in under the intro's tail
+                lo, hi = max(start, voice_start), min(end, voice_end)
+                if lo < hi:
+                    if voice_file is not None:
+                        voice_file.read(hi - lo, dtype="float32", out=block[lo - start:hi - start])
+                    else:
+                        block[lo - start:hi - start] = voice[lo - voice_start:hi - voice_start]
+                    if plan["intro_crossfade"] and lo < voice_start + cf:
+                        hi_fade = min(hi, voice_start + cf)
+                        offset = np.arange(lo - voice_start, hi_fade - voice_start)
+                        ramp = offset.astype(AUDIO_DTYPE) / AUDIO_DTYPE(max(1, cf - 1))
+                        fade_in = 0.2 + 0.8 * ramp
+                        fade_out = 1.0 - 0.8 * ramp
+                        tail = intro[len(intro) - cf + offset]
+                        region = block[lo - start:hi_fade - start]
+                        region *= fade_in
+                        region += tail * fade_out * 0.3
                 
-                # Loop background music to match voice length
-                voice_length = len(final_audio)
-                bg_length = len(bg_audio)
+                # Background bed looped under intro and voice at low volume
+                if background is not None and start < voice_end:
+                    stop = min(end, voice_end)
+                    block[:stop - start] += background.read(stop - start) * 0.15
                 
-                if bg_length < voice_length:
-                    loops_needed = int(np.ceil(voice_length / bg_length))
-                    bg_audio = np.tile(bg_audio, loops_needed)[:voice_length]
-                else:
-                    bg_audio = bg_audio[:voice_length]
+                # Outro, crossfaded with the end of the voice
+                if end > outro_start:
+                    lo = max(start, outro_start)
+                    offset = np.arange(lo - outro_start, end - outro_start)
+                    region = block[lo - start:]
+                    if plan["outro_crossfade"]:
+                        overlap = offset < cf
+                        ramp = offset[overlap].astype(AUDIO_DTYPE) / AUDIO_DTYPE(max(1, cf - 1))
+                        region[overlap] *= (1.0 - 0.8 * ramp) * 0.3
+                        region[overlap] += outro[offset[overlap]] * (0.2 + 0.8 * ramp)
+                        region[~overlap] = outro[offset[~overlap]]
+                    else:
+                        region[:] = outro[offset]
                 
-                # Mix background at low volume
-                final_audio = final_audio + (bg_audio * 0.15)
-            
-            # Add outro music
-            if outro_music and os.path.exists(outro_music):
-                outro_audio, outro_sr = sf.read(outro_music)
-                if outro_sr != target_sr:
-                    outro_audio = librosa.resample(outro_audio, orig_sr=outro_sr, target_sr=target_sr)
-                
-                # Crossfade voice with outro
-                crossfade_samples = int(1.0 * target_sr)
-                
-                if len(outro_audio) > crossfade_samples and len(final_audio) > crossfade_samples:
-                    fade_out = np.linspace(1, 0.2, crossfade_samples)
-                    fade_in = np.linspace(0.2, 1, crossfade_samples)
-                    
-                    final_audio[-crossfade_samples:] *= fade_out
-                    outro_audio[:crossfade_samples] *= fade_in
-                    outro_audio[:crossfade_samples] += final_audio[-crossfade_samples:] * 0.3
-                
-                final_audio = np.concatenate([final_audio[:-crossfade_samples], outro_audio])
-            
-            # Normalize final audio
-            max_amplitude = np.max(np.abs(final_audio))
-            if max_amplitude > 1.0:
-                final_audio = final_audio / max_amplitude * 0.95
-            
-            # Save final production
-            final_file = os.path.join(self.output_dir, f"full_production_{int(time.time())}.wav")
-            sf.write(final_file, final_audio, target_sr)
-            
-            logger.info(f"Created full production: {final_file}")
-            return final_file
-            
-        except Exception as e:
-            logger.error(f"Audio mixing failed: {e}")
-            raise Exception(f"Audio mixing failed: {str(e)}")
+                yield block
+        finally:
+            if voice_file is not None:
+                voice_file.close()
+            if background is not None:
+                background.close()
     
-    def enhance_audio_quality(self, audio_file: str) -> str:
-        """Apply audio enhancement (normalize, noise reduction, etc.)"""
-        try:
-            audio_data, sample_rate = sf.read(audio_file)
-            
-            # Normalize audio
-            max_amplitude = np.max(np.abs(audio_data))
-            if max_amplitude > 0:
-                audio_data = audio_data / max_amplitude * 0.95
+    def _build_graph(self, peak: float, sample_rate: int, enhance: bool,
+                     effects: Optional[List[Any]]) -> List[Callable[[np.ndarray], np.ndarray]]:
+        """Per-block processing stages applied in order after mixing"""
+        stages = []
+        
+        if enhance:
+            # Normalize to 0.95 of the measured peak
+            if peak > 0:
+                gain = 0.95 / peak
+                stages.append(lambda block: np.multiply(block, gain, out=block))
             
-            # Simple noise gate (remove very quiet parts)
+            # Simple noise gate (attenuate very quiet samples)
             noise_threshold = 0.01
-            audio_data[np.abs(audio_data) < noise_threshold] *= 0.1
+            def gate(block):
+                block[np.abs(block) < noise_threshold] *= 0.1
+                return block
+            stages.append(gate)
             
-            # Save enhanced audio
-            enhanced_file = os.path.join(self.output_dir, f"enhanced_{int(time.time())}.wav")
-            sf.write(enhanced_file, audio_data, sample_rate)
-            
-            return enhanced_file
+            plugins = [Compressor(threshold_db=-16, ratio=4)] + list(effects or [])
+        else:
+            # Plain mix: only pull the level down if the sum clips
+            if peak > 1.0:
+                gain = 0.95 / peak
+                stages.append(lambda block: np.multiply(block, gain, out=block))
+            plugins = list(effects or [])
+        
+        if plugins:
+            # One board for the whole render; reset=False carries envelope and tail state across blocks
+            board = Pedalboard(plugins)
+            stages.append(lambda block: board(block, sample_rate, reset=False))
+        
+        stages.append(lambda block: np.clip(block, -1.0, 1.0, out=block))
+        return stages
+    
+    def _render_production(self, voice, sample_rate: Optional[int], intro_music: Optional[str],
+                           outro_music: Optional[str], background_music: Optional[str],
+                           enhance: bool, effects: Optional[List[Any]], output_file: Optional[str] = None,
+                           segment_writer=None) -> str:
+        plan = self._plan(voice, sample_rate, intro_music, outro_music, background_music)
+        
+        # First pass only measures the peak, so normalization needs no full-length buffer
+        peak = 0.0
+        for block in self._iter_mix(plan):
+            if len(block):
+                peak = max(peak, float(np.max(np.abs(block))))
+        graph = self._build_graph(peak, plan["sample_rate"], enhance, effects)
+        
+        final_file = output_file or os.path.join(
+            self.output_dir, f"full_production_{int(time.time())}_{uuid.uuid4().hex[:8]}.wav"
+        )
+        # Render under a temporary name so the master never exists half-written
+        temp_file = partial_path(final_file)
+        try:
+            with sf.SoundFile(temp_file, "w", samplerate=plan["sample_rate"], channels=1,
+                              subtype="PCM_16", format="WAV") as out:
+                for block in self._iter_mix(plan):
+                    for stage in graph:
+                        block = stage(block)
+                    out.write(block)
+                    if segment_writer is not None:
+                        # Each finished block goes straight to the segmenter, so segments
+                        # are published while the rest of the episode is still mixing
+                        segment_writer.write(block)
+            os.replace(temp_file, final_file)
+        except BaseException:
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+            raise
+        
+        logger.info(f"Created full production: {final_file} ({plan['total_length'] / plan['sample_rate']:.1f}s)")
+        return final_file
+    
+    async def create_full_production(self, voice, intro_music: str = None, 
+                                   outro_music: str = None, background_music: str = None,
+                                   sample_rate: Optional[int] = None, enhance: bool = False,
+                                   effects: Optional[List[Any]] = None, output_file: Optional[str] = None,
+                                   segment_writer=None) -> str:
+        """Create full podcast production with intro, voice, and outro
+        
+        ``voice`` is a file path, or a float32 array together with ``sample_rate``.
+        ``enhance`` adds normalization, noise gate and compression to the same
+        pass, and ``effects`` are extra pedalboard plugins applied last.
+        ``segment_writer`` (a stream_packager.SegmentWriter) additionally receives
+        every rendered block; the caller closes it.
+        """
+        try:
+            loop = asyncio.get_event_loop()
+            return await loop.run_in_executor(
+                None, self._render_production,
+                voice, sample_rate, intro_music, outro_music, background_music, enhance, effects,
+                output_file, segment_writer
+            )
             
         except Exception as e:
-            logger.error(f"Audio enhancement failed: {e}")
-            return audio_file  # Return original if enhancement fails
+            logger.error(f"Audio mixing failed: {e}")
+            raise Exception(f"Audio mixing failed: {str(e)}")
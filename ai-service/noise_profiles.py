@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Noise Profile Store for AI Service
+Noise-only clips captured once per recording setup and reused for stationary denoising
+"""
+
+import os
+import glob
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import soundfile as sf
+
+from denoise import estimate_noise_clip
+
+logger = logging.getLogger(__name__)
+
+
+class NoiseProfileStore:
+    """Persist a short noise clip per profile id (a voice, user or room).
+
+    Stationary noise reduction only needs the noise spectrum statistics, which a
+    few seconds of noise capture well, so clips are trimmed to ``max_seconds``
+    and stored as float16 in ``<profiles_dir>/<profile_id>.npz``. Later requests
+    skip re-estimating the noise floor and get the same treatment every time.
+    """
+
+    def __init__(self, profiles_dir: str = os.path.join("cache", "noise_profiles"), max_seconds: float = 3.0):
+        self.profiles_dir = profiles_dir
+        self.max_seconds = max_seconds
+        self._memory: Dict[str, Tuple[np.ndarray, int]] = {}
+        self._lock = threading.Lock()
+        os.makedirs(profiles_dir, exist_ok=True)
+
+    def _profile_path(self, profile_id: str) -> str:
+        return os.path.join(self.profiles_dir, f"{profile_id}.npz")
+
+    def load(self, profile_id: str) -> Optional[Tuple[np.ndarray, int]]:
+        """(clip, sample_rate) at the rate it was captured, or None"""
+        with self._lock:
+            entry = self._memory.get(profile_id)
+        if entry is not None:
+            return entry
+
+        path = self._profile_path(profile_id)
+        if not os.path.exists(path):
+            return None
+
+        with np.load(path) as data:
+            entry = (data["clip"].astype(np.float32), int(data["sample_rate"]))
+        with self._lock:
+            self._memory[profile_id] = entry
+        return entry
+
+    def save(self, profile_id: str, clip: np.ndarray, sample_rate: int, source: str) -> Dict[str, Any]:
+        clip = np.asarray(clip, dtype=np.float32)[:int(self.max_seconds * sample_rate)]
+
+        # Write then rename so readers never see a partial file
+        path = self._profile_path(profile_id)
+        temp_path = f"{path}.tmp.npz"
+        np.savez(temp_path, clip=clip.astype(np.float16), sample_rate=sample_rate, source=source)
+        os.replace(temp_path, path)
+
+        with self._lock:
+            self._memory[profile_id] = (clip, sample_rate)
+        logger.info(f"Saved noise profile '{profile_id}' ({len(clip) / sample_rate:.1f}s, {source})")
+        return {"profile_id": profile_id, "seconds": len(clip) / sample_rate, "sample_rate": sample_rate,
+                "source": source}
+
+    def capture(self, profile_id: str, audio_path: str, noise_only: bool = True) -> Dict[str, Any]:
+        """Build a profile from a noise-only clip, or from the quiet parts of a recording (blocking)"""
+        sample_rate = sf.info(audio_path).samplerate
+        if noise_only:
+            with sf.SoundFile(audio_path) as source:
+                clip = source.read(int(self.max_seconds * sample_rate), dtype="float32", always_2d=True).mean(axis=1)
+            source_kind = "clip"
+        else:
+            clip = estimate_noise_clip(audio_path, min_seconds=min(1.0, self.max_seconds))
+            source_kind = "estimated"
+
+        if clip is None or len(clip) < sample_rate * 0.25:
+            raise ValueError("Not enough audio to build a noise profile (need at least 0.25s of noise)")
+        return self.save(profile_id, clip, sample_rate, source_kind)
+
+    def delete(self, profile_id: str) -> bool:
+        with self._lock:
+            self._memory.pop(profile_id, None)
+        path = self._profile_path(profile_id)
+        if not os.path.exists(path):
+            return False
+        os.remove(path)
+        return True
+
+    def list_profiles(self) -> List[Dict[str, Any]]:
+        profiles = []
+        for path in sorted(glob.glob(os.path.join(self.profiles_dir, "*.npz"))):
+            with np.load(path) as data:
+                sample_rate = int(data["sample_rate"])
+                profiles.append({
+                    "profile_id": os.path.splitext(os.path.basename(path))[0],
+                    "seconds": len(data["clip"]) / sample_rate,
+                    "sample_rate": sample_rate,
+                    "source": str(data["source"]),
+                    "created_at": os.path.getmtime(path)
+                })
+        return profiles
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Output Store for AI Service
+Byte-quota LRU garbage collection of generated artifacts, with pins for live references
+"""
+
+import os
+import time
+import shutil
+import asyncio
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class OutputStore:
+    """Index every artifact under ``output_dir`` and keep the directory under a byte quota.
+
+    An artifact is a top-level entry of the directory, or an entry of one of the
+    ``group_dirs`` (e.g. ``streams/<stream_id>``); directory artifacts are sized
+    and evicted as a whole. Each one is tracked with its size and last access; a
+    periodic collection deletes the least recently used artifacts until the total
+    fits ``max_bytes``.
+
+    Artifacts that are pinned (by a running task, a cache entry or a live stream)
+    or younger than ``grace_seconds`` are never evicted. Files written without
+    going through ``record`` are picked up by the directory scan on each pass.
+    """
+
+    def __init__(self, output_dir: str, max_bytes: int = 10 * 1024 ** 3,
+                 gc_interval: float = 60.0, grace_seconds: float = 300.0,
+                 group_dirs: Tuple[str, ...] = ("streams",)):
+        self.output_dir = os.path.abspath(output_dir)
+        self.group_dirs = group_dirs
+        self.max_bytes = max_bytes
+        self.gc_interval = gc_interval
+        self.grace_seconds = grace_seconds
+        self.collections = 0
+        self.evicted_artifacts = 0
+        self.evicted_bytes = 0
+        self.last_collection = None
+
+        self._entries: Dict[str, Dict[str, float]] = {}  # name -> {"size", "last_access", "created"}
+        self._pins: Dict[str, Dict[str, Optional[float]]] = {}  # name -> {owner: expires_at or None}
+        self._lock = threading.Lock()
+        self._task = None
+        os.makedirs(output_dir, exist_ok=True)
+
+    def _name(self, path: str) -> Optional[str]:
+        """Artifact name for a path inside the store, None for paths outside it"""
+        relative = os.path.relpath(os.path.abspath(path), self.output_dir)
+        if relative == "." or relative.startswith(os.pardir):
+            return None
+        parts = relative.split(os.sep)
+        if parts[0] in self.group_dirs:
+            return os.path.join(parts[0], parts[1]) if len(parts) > 1 else None
+        return parts[0]
+
+    def _list_artifacts(self) -> List[str]:
+        names = []
+        for name in os.listdir(self.output_dir):
+            if name in self.group_dirs and os.path.isdir(os.path.join(self.output_dir, name)):
+                names.extend(os.path.join(name, child) for child in os.listdir(os.path.join(self.output_dir, name)))
+            else:
+                names.append(name)
+        return names
+
+    def _size(self, name: str) -> int:
+        path = os.path.join(self.output_dir, name)
+        if not os.path.isdir(path):
+            return os.path.getsize(path)
+        total = 0
+        for root, _, files in os.walk(path):
+            for file_name in files:
+                try:
+                    total += os.path.getsize(os.path.join(root, file_name))
+                except FileNotFoundError:
+                    pass
+        return total
+
+    def record(self, path: str) -> str:
+        """Index a newly written artifact (or refresh its size); returns ``path``"""
+        name = self._name(path)
+        if name is None:
+            return path
+        try:
+            size = self._size(name)
+        except FileNotFoundError:
+            return path
+        now = time.time()
+        with self._lock:
+            entry = self._entries.setdefault(name, {"created": now})
+            entry["size"] = size
+            entry["last_access"] = now
+        return path
+
+    def touch(self, path: str):
+        """Mark an artifact as used (served, or returned from a cache)"""
+        name = self._name(path)
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None:
+                entry["last_access"] = time.time()
+
+    def pin(self, path: str, owner: str, ttl: Optional[float] = None):
+        """Protect an artifact from eviction until ``owner`` unpins it (or ``ttl`` seconds pass)"""
+        name = self._name(path)
+        if name is None:
+            return
+        with self._lock:
+            self._pins.setdefault(name, {})[owner] = time.time() + ttl if ttl is not None else None
+
+    def unpin(self, path: str, owner: str):
+        name = self._name(path)
+        with self._lock:
+            owners = self._pins.get(name)
+            if owners is not None:
+                owners.pop(owner, None)
+                if not owners:
+                    del self._pins[name]
+
+    @contextmanager
+    def pinned(self, paths: Iterable[str], owner: str):
+        """Pin ``paths`` (which need not exist yet) for the duration of a with block"""
+        paths = [path for path in paths if path]
+        for path in paths:
+            self.pin(path, owner)
+        try:
+            yield
+        finally:
+            for path in paths:
+                self.unpin(path, owner)
+
+    def _is_pinned(self, name: str, now: float) -> bool:
+        owners = self._pins.get(name)
+        if not owners:
+            return False
+        for owner, expires_at in list(owners.items()):
+            if expires_at is not None and expires_at <= now:
+                del owners[owner]
+        if not owners:
+            del self._pins[name]
+            return False
+        return True
+
+    def _scan(self):
+        """Reconcile the index with the directory: add unindexed artifacts, drop vanished ones"""
+        on_disk = set(self._list_artifacts())
+        with self._lock:
+            known = set(self._entries)
+            for name in known - on_disk:
+                del self._entries[name]
+
+        for name in on_disk:
+            path = os.path.join(self.output_dir, name)
+            try:
+                stat = os.stat(path)
+                size = self._size(name)
+            except FileNotFoundError:
+                continue
+            with self._lock:
+                entry = self._entries.get(name)
+                if entry is None:
+                    # Files from before a restart: their mtime is the best last-access estimate
+                    self._entries[name] = {"size": size, "last_access": stat.st_mtime, "created": stat.st_mtime}
+                else:
+                    entry["size"] = size
+
+    def collect(self) -> int:
+        """Evict least recently used artifacts until the store fits its quota (blocking); returns bytes freed"""
+        self._scan()
+        now = time.time()
+        with self._lock:
+            total = sum(entry["size"] for entry in self._entries.values())
+            candidates = sorted(
+                (entry["last_access"], name, entry["size"]) for name, entry in self._entries.items()
+                if not self._is_pinned(name, now) and now - entry["created"] >= self.grace_seconds
+            )
+
+        freed = 0
+        evicted = 0
+        for _, name, size in candidates:
+            if total - freed <= self.max_bytes:
+                break
+            with self._lock:
+                # A pin may have arrived, or the file grown, since the candidates were listed
+                entry = self._entries.get(name)
+                if entry is None or self._is_pinned(name, time.time()) or entry["size"] != size:
+                    continue
+                del self._entries[name]
+
+            path = os.path.join(self.output_dir, name)
+            try:
+                if os.path.isdir(path):
+                    shutil.rmtree(path)
+                else:
+                    os.remove(path)
+            except FileNotFoundError:
+                pass
+            freed += size
+            evicted += 1
+
+        with self._lock:
+            self.collections += 1
+            self.evicted_artifacts += evicted
+            self.evicted_bytes += freed
+            self.last_collection = now
+        if evicted:
+            logger.info(f"Output store evicted {evicted} artifacts ({freed / 1024 ** 2:.1f} MB); "
+                        f"{(total - freed) / 1024 ** 2:.1f} MB of {self.max_bytes / 1024 ** 2:.0f} MB used")
+        elif total > self.max_bytes:
+            logger.warning(f"Output store over quota ({total / 1024 ** 2:.1f} MB) with nothing evictable")
+        return freed
+
+    async def _run(self):
+        loop = asyncio.get_event_loop()
+        while True:
+            try:
+                await loop.run_in_executor(None, self.collect)
+            except Exception as e:
+                logger.error(f"Output store collection failed: {e}")
+            await asyncio.sleep(self.gc_interval)
+
+    def start(self):
+        """Start the background collection loop (call from the running event loop)"""
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "artifacts": len(self._entries),
+                "bytes": sum(entry["size"] for entry in self._entries.values()),
+                "quota_bytes": self.max_bytes,
+                "pinned": len(self._pins),
+                "collections": self.collections,
+                "evicted_artifacts": self.evicted_artifacts,
+                "evicted_bytes": self.evicted_bytes,
+                "last_collection": self.last_collection
+            }
@@ -4,7 +4,6 @@ AI Service Performance Optimizations
 import asyncio
 import asyncpg
 from concurrent.futures import ThreadPoolExecutor
-from functools import lru_cache
 import aioredis
 from contextlib import asynccontextmanager
 import os
@@ -14,7 +13,7 @@ import logging
 from typing import Optional, Dict, Any
 import uuid
 import httpx
-from TTS.api import TTS
+from tts_engine import get_tts_model
 from groq import Groq
 from celery import Celery
 
@@ -23,15 +22,12 @@ logger = logging.getLogger(__name__)
 class ModelCache:
     """Cache for TTS models to avoid reloading"""
     def __init__(self):
-        self.tts_models = {}
         self.voice_cache = {}
         self.script_cache = {}
     
-    @lru_cache(maxsize=128)
     def get_tts_model(self, model_name: str):
-        if model_name not in self.tts_models:
-            self.tts_models[model_name] = TTS(model_name)
-        return self.tts_models[model_name]
+        # Models live in the shared registry, which bounds them by memory
+        return get_tts_model(model_name)
     
     async def preload_models(self):
         """Preload commonly used models"""
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Request Coalescing for AI Service
+Single-flight execution so identical in-flight script/TTS requests share one result
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_text(value: str) -> str:
+    """Normalize free text so trivially different requests share a key"""
+    return " ".join(value.split()).casefold()
+
+
+def make_request_key(kind: str, params: Dict[str, Any]) -> str:
+    """Build a stable key from a request type and its (already normalized) parameters"""
+    payload = json.dumps({"kind": kind, "params": params}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class SingleFlight:
+    """Let concurrent callers with the same key await one shared execution.
+
+    The first caller for a key (the leader) starts the work as its own task; every
+    caller, leader included, awaits it through ``asyncio.shield`` so a disconnecting
+    client does not cancel the work for everyone else waiting on it.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.in_flight: Dict[str, asyncio.Task] = {}
+        self.leaders = 0
+        self.coalesced = 0
+        self.failures = 0
+
+    async def run(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Run ``fn`` once per key; returns ``(result, coalesced)``"""
+        task = self.in_flight.get(key)
+        coalesced = task is not None
+
+        if coalesced:
+            self.coalesced += 1
+            logger.info(f"Coalesced {self.name} request onto in-flight call: {key[:8]}...")
+        else:
+            self.leaders += 1
+            task = asyncio.ensure_future(fn())
+            self.in_flight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+
+        return await asyncio.shield(task), coalesced
+
+    def _finish(self, key: str, task: asyncio.Task):
+        if self.in_flight.get(key) is task:
+            del self.in_flight[key]
+        # Mark the exception as retrieved even if every waiter went away
+        if not task.cancelled() and task.exception() is not None:
+            self.failures += 1
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.leaders + self.coalesced
+        return {
+            "executions": self.leaders,
+            "coalesced_hits": self.coalesced,
+            "coalesce_rate": self.coalesced / total if total > 0 else 0,
+            "failures": self.failures,
+            "in_flight": len(self.in_flight)
+        }
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Resampling Service for AI Service
+Pooled soxr streaming resamplers shared by the combiner and the mixer
+"""
+
+import logging
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+import numpy as np
+import soxr
+
+logger = logging.getLogger(__name__)
+
+
+class Resampler:
+    """Convert mono float32 audio between sample rates with soxr.
+
+    Building a soxr resampler designs its polyphase filter, so streams are kept
+    in a pool per (src_rate, dst_rate) pair and cleared for reuse instead of
+    being rebuilt on every call. Audio is fed through in ``chunk_size`` frames,
+    which bounds working memory and lets callers stream long inputs.
+    """
+
+    def __init__(self, quality: str = "HQ", chunk_size: int = 65536, max_pooled: int = 4):
+        self.quality = quality
+        self.chunk_size = chunk_size
+        self.max_pooled = max_pooled
+        self._pool: Dict[Tuple[int, int], List[soxr.ResampleStream]] = defaultdict(list)
+        self._created: Dict[Tuple[int, int], int] = defaultdict(int)
+        self._uses: Dict[Tuple[int, int], int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stream(self, src_rate: int, dst_rate: int) -> Iterator[soxr.ResampleStream]:
+        """Borrow a clean streaming resampler for one src -> dst conversion"""
+        key = (src_rate, dst_rate)
+        with self._lock:
+            self._uses[key] += 1
+            stream = self._pool[key].pop() if self._pool[key] else None
+            if stream is None:
+                self._created[key] += 1
+        if stream is None:
+            stream = soxr.ResampleStream(src_rate, dst_rate, 1, dtype="float32", quality=self.quality)
+
+        try:
+            yield stream
+        finally:
+            stream.clear()
+            with self._lock:
+                if len(self._pool[key]) < self.max_pooled:
+                    self._pool[key].append(stream)
+
+    def iter_resample(self, chunks: Iterable[np.ndarray], src_rate: int, dst_rate: int) -> Iterator[np.ndarray]:
+        """Resample a stream of chunks, yielding output chunks as they become available"""
+        if src_rate == dst_rate:
+            yield from chunks
+            return
+
+        with self.stream(src_rate, dst_rate) as stream:
+            for chunk in chunks:
+                out = stream.resample_chunk(np.asarray(chunk, dtype=np.float32))
+                if len(out):
+                    yield out
+            tail = stream.resample_chunk(np.zeros(0, dtype=np.float32), last=True)
+            if len(tail):
+                yield tail
+
+    def resample(self, audio: np.ndarray, src_rate: int, dst_rate: int) -> np.ndarray:
+        """Resample a whole array into one preallocated float32 output"""
+        audio = np.asarray(audio, dtype=np.float32)
+        if src_rate == dst_rate:
+            return audio
+
+        expected = int(np.ceil(len(audio) * dst_rate / src_rate))
+        output = np.empty(expected, dtype=np.float32)
+        filled = 0
+        chunks = (audio[i:i + self.chunk_size] for i in range(0, len(audio), self.chunk_size))
+        for out in self.iter_resample(chunks, src_rate, dst_rate):
+            if filled + len(out) > len(output):
+                output = np.resize(output, filled + len(out))
+            output[filled:filled + len(out)] = out
+            filled += len(out)
+        return output[:filled]
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {
+                f"{src}->{dst}": {
+                    "uses": self._uses[(src, dst)],
+                    "resamplers_built": self._created[(src, dst)],
+                    "pooled": len(self._pool[(src, dst)])
+                }
+                for src, dst in self._uses
+            }
+
+
+resampler = Resampler()
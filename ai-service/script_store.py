@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Persistent Script Cache for AI Service
+Content-addressed script store with an in-memory LRU in front of a shared SQLite file
+"""
+
+import os
+import time
+import sqlite3
+import threading
+import logging
+from collections import OrderedDict
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ScriptStore:
+    """Script cache keyed by a canonical hash of the full request.
+
+    The memory tier is an ``OrderedDict`` used as an O(1) LRU. The disk tier is a
+    SQLite database in WAL mode, so it survives restarts and is shared by every
+    uvicorn worker pointed at the same file.
+    """
+
+    def __init__(self, db_path: str, ttl: float = 86400, max_memory_entries: int = 100,
+                 max_disk_entries: int = 5000, evict_every: int = 50, access_flush_every: int = 50):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.evict_every = evict_every
+        self.access_flush_every = access_flush_every
+        self._memory = OrderedDict()  # key -> (script, created_at)
+        self._pending_access = {}  # key -> last memory-tier hit not yet written to disk
+        self._writes = 0
+        self._lock = threading.Lock()
+
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, timeout=10, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS scripts ("
+            "key TEXT PRIMARY KEY, script TEXT NOT NULL, "
+            "created_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_scripts_last_access ON scripts(last_access)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached script for ``key`` or None if missing or expired"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                script, created_at = entry
+                if now - created_at < self.ttl:
+                    self._memory.move_to_end(key)
+                    # Memory hits must refresh the disk LRU too, or the hottest scripts
+                    # keep their oldest timestamps and are evicted from disk first
+                    self._pending_access[key] = now
+                    if len(self._pending_access) >= self.access_flush_every:
+                        self._flush_access()
+                    return script
+                del self._memory[key]
+
+            row = self._conn.execute(
+                "SELECT script, created_at FROM scripts WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            script, created_at = row
+            if now - created_at >= self.ttl:
+                self._conn.execute("DELETE FROM scripts WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+
+            self._conn.execute("UPDATE scripts SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self._remember(key, script, created_at)
+            return script
+
+    def set(self, key: str, script: str):
+        """Store ``script`` under ``key`` in both tiers"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO scripts (key, script, created_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, script, now, now)
+            )
+            self._flush_access()
+            self._conn.commit()
+            self._remember(key, script, now)
+
+            self._writes += 1
+            if self._writes % self.evict_every == 0:
+                self._evict_disk(now)
+
+    def size(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM scripts").fetchone()[0]
+
+    def memory_size(self) -> int:
+        return len(self._memory)
+
+    def flush(self):
+        """Write batched memory-tier access times to disk"""
+        with self._lock:
+            self._flush_access()
+
+    def _flush_access(self):
+        if not self._pending_access:
+            return
+        self._conn.executemany(
+            "UPDATE scripts SET last_access = MAX(last_access, ?) WHERE key = ?",
+            [(accessed_at, key) for key, accessed_at in self._pending_access.items()]
+        )
+        self._conn.commit()
+        self._pending_access.clear()
+
+    def _remember(self, key: str, script: str, created_at: float):
+        self._memory[key] = (script, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self, now: float):
+        """Drop expired rows, then least-recently-used rows beyond the disk limit"""
+        self._flush_access()
+        self._conn.execute("DELETE FROM scripts WHERE created_at < ?", (now - self.ttl,))
+        count = self._conn.execute("SELECT COUNT(*) FROM scripts").fetchone()[0]
+        overflow = count - self.max_disk_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM scripts WHERE key IN "
+                "(SELECT key FROM scripts ORDER BY last_access LIMIT ?)",
+                (overflow,)
+            )
+            logger.info(f"Evicted {overflow} least recently used scripts from disk cache")
+        self._conn.commit()
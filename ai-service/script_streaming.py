@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Streaming Script Generation for AI Service
+Emits script sentences as the LLM produces them and pipelines them into TTS
+"""
+
+import asyncio
+import json
+import re
+import logging
+import threading
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Tuple, Any
+
+logger = logging.getLogger(__name__)
+
+# Sentence terminator followed by whitespace (optionally after a closing quote/bracket)
+_SENTENCE_END = re.compile(r'([.!?]+["\')\]]*)\s+')
+
+# Abbreviations that end with a period but do not end a sentence
+_ABBREVIATIONS = {"mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "vs", "etc", "e.g", "i.e"}
+
+_STREAM_DONE = object()
+
+
+def split_sentences(text: str, min_chars: int = 20) -> Tuple[List[str], str]:
+    """Split text into complete sentences and the unfinished remainder.
+
+    Fragments shorter than ``min_chars`` are merged into the following sentence so
+    that TTS is not called for tiny snippets like "Yes." on their own.
+    """
+    sentences = []
+    pending = ""
+    start = 0
+
+    for match in _SENTENCE_END.finditer(text):
+        candidate = text[start:match.end(1)]
+        last_word = candidate.rstrip('.!?"\')]').rsplit(None, 1)[-1].lower() if candidate.strip() else ""
+        if match.group(1).startswith(".") and last_word in _ABBREVIATIONS:
+            continue
+
+        pending = f"{pending} {candidate.strip()}".strip() if pending else candidate.strip()
+        start = match.end()
+        if len(pending) >= min_chars:
+            sentences.append(pending)
+            pending = ""
+
+    remainder = text[start:]
+    if pending:
+        remainder = f"{pending} {remainder}" if remainder else pending
+    return sentences, remainder
+
+
+def split_text_into_sentences(text: str, min_chars: int = 20) -> List[str]:
+    """Split a complete text into sentences, keeping any unterminated tail as the last one"""
+    sentences, remainder = split_sentences(text, min_chars)
+    remainder = remainder.strip()
+    return sentences + [remainder] if remainder else sentences
+
+
+class SentenceStreamer:
+    """Accumulates streamed text deltas and releases completed sentences"""
+
+    def __init__(self, min_chars: int = 20):
+        self.min_chars = min_chars
+        self.buffer = ""
+        self.full_text = []
+
+    def feed(self, delta: str) -> List[str]:
+        """Add a text delta and return any sentences it completed"""
+        if not delta:
+            return []
+        self.full_text.append(delta)
+        self.buffer += delta
+        sentences, self.buffer = split_sentences(self.buffer, self.min_chars)
+        return sentences
+
+    def flush(self) -> List[str]:
+        """Return whatever is left once the stream has ended"""
+        remainder = self.buffer.strip()
+        self.buffer = ""
+        return [remainder] if remainder else []
+
+    @property
+    def text(self) -> str:
+        return "".join(self.full_text)
+
+
+async def stream_groq_completion(client, prompt: str, model: str,
+                                 temperature: float = 0.7, max_tokens: int = 2048) -> AsyncIterator[str]:
+    """Async generator yielding Groq completion deltas as they arrive.
+
+    The Groq SDK stream is a blocking iterator, so it is drained on a worker thread
+    and handed back to the event loop through a queue. Closing the generator early
+    (e.g. the SSE client disconnected) stops the thread at the next chunk and
+    closes the SDK stream, so nothing keeps reading tokens for nobody.
+    """
+    loop = asyncio.get_event_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    stop = threading.Event()
+
+    def drain_stream():
+        stream = None
+        try:
+            stream = client.chat.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True
+            )
+            for chunk in stream:
+                if stop.is_set():
+                    break
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    loop.call_soon_threadsafe(queue.put_nowait, delta)
+        except Exception as e:
+            loop.call_soon_threadsafe(queue.put_nowait, e)
+        finally:
+            if stop.is_set() and stream is not None and hasattr(stream, "close"):
+                stream.close()
+            loop.call_soon_threadsafe(queue.put_nowait, _STREAM_DONE)
+
+    producer = loop.run_in_executor(None, drain_stream)
+
+    try:
+        while True:
+            item = await queue.get()
+            if item is _STREAM_DONE:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        await producer
+
+
+async def stream_script_sentences(client, prompt: str, model: str,
+                                  streamer: Optional[SentenceStreamer] = None) -> AsyncIterator[str]:
+    """Async generator yielding complete script sentences while the LLM is still writing.
+
+    Pass a ``streamer`` to read the full script text back once iteration finishes.
+    """
+    streamer = streamer or SentenceStreamer()
+    deltas = stream_groq_completion(client, prompt, model)
+    try:
+        async for delta in deltas:
+            for sentence in streamer.feed(delta):
+                yield sentence
+    finally:
+        await deltas.aclose()
+    for sentence in streamer.flush():
+        yield sentence
+
+
+async def iter_sentences(sentences: List[str]) -> AsyncIterator[str]:
+    """Async iterator over an already complete list of sentences"""
+    for sentence in sentences:
+        yield sentence
+
+
+async def pipeline_sentences(sentences: AsyncIterator[str],
+                             process: Callable[[str], Awaitable[Any]],
+                             max_in_flight: int = 3) -> AsyncIterator[Tuple[int, str, Any]]:
+    """Producer/consumer pipeline from a sentence stream into ``process`` (e.g. TTS).
+
+    Sentences are handed to ``process`` as soon as they arrive, up to ``max_in_flight``
+    at once, while the producer keeps pulling later text. Results are yielded in
+    script order as ``(index, sentence, result)``; the first failure is re-raised.
+    When the consumer stops early, ``sentences`` is closed so its source stops too.
+    """
+    pending: asyncio.Queue = asyncio.Queue(maxsize=max_in_flight)
+
+    async def produce():
+        index = 0
+        try:
+            async for sentence in sentences:
+                task = asyncio.ensure_future(process(sentence))
+                try:
+                    await pending.put((index, sentence, task))
+                except asyncio.CancelledError:
+                    task.cancel()
+                    raise
+                index += 1
+        except Exception as e:
+            await pending.put(e)
+        else:
+            await pending.put(_STREAM_DONE)
+
+    producer = asyncio.ensure_future(produce())
+
+    try:
+        while True:
+            item = await pending.get()
+            if item is _STREAM_DONE:
+                break
+            if isinstance(item, Exception):
+                raise item
+            index, sentence, task = item
+            yield index, sentence, await task
+    finally:
+        producer.cancel()
+        while not pending.empty():
+            item = pending.get_nowait()
+            if isinstance(item, tuple):
+                item[2].cancel()
+        # The producer must unwind before its source can be closed
+        await asyncio.gather(producer, return_exceptions=True)
+        if hasattr(sentences, "aclose"):
+            await sentences.aclose()
+
+
+def format_sse(event: str, data: Any) -> str:
+    """Format a single Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Sentence-Level TTS Audio Cache for AI Service
+Content-addressed per-sentence audio so edited scripts only re-synthesize changed sentences
+"""
+
+import os
+import json
+import hashlib
+import logging
+import time
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import numpy as np
+import soundfile as sf
+
+logger = logging.getLogger(__name__)
+
+
+class SentenceAudioCache:
+    """Per-sentence audio keyed by (sentence text, model, voice, speed, pitch).
+
+    Entries are float32 WAV files named by content hash, written atomically so
+    several uvicorn workers can share one directory, with a byte-bounded
+    in-memory LRU in front for hot sentences. A file's mtime is its last access:
+    memory hits are batched and written back with ``os.utime`` every
+    ``access_flush_every`` hits (and before each prune) so hot sentences are the
+    last to be pruned from disk.
+    """
+
+    def __init__(self, cache_dir: str, max_memory_bytes: int = 256 * 1024 * 1024,
+                 max_disk_bytes: int = 2 * 1024 * 1024 * 1024, prune_every: int = 200,
+                 access_flush_every: int = 50):
+        self.cache_dir = cache_dir
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.prune_every = prune_every
+        self.access_flush_every = access_flush_every
+        self._memory = OrderedDict()  # key -> (audio, sample_rate)
+        self._pending_access = {}  # key -> last memory hit not yet written to the file's mtime
+        self._memory_bytes = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(sentence: str, model: str, voice: str, speed: float, pitch: float) -> str:
+        payload = json.dumps([sentence, model, voice, float(speed), float(pitch)])
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.wav")
+
+    def get(self, key: str) -> Optional[Tuple[np.ndarray, int]]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self._pending_access[key] = time.time()
+                should_flush = len(self._pending_access) >= self.access_flush_every
+        if entry is not None:
+            if should_flush:
+                self.flush()
+            return entry
+
+        path = self._path(key)
+        try:
+            audio, sample_rate = sf.read(path, dtype="float32")
+            os.utime(path)  # mtime doubles as last access for pruning
+        except (FileNotFoundError, RuntimeError):
+            return None
+
+        self._remember(key, audio, sample_rate)
+        return audio, sample_rate
+
+    def set(self, key: str, audio: np.ndarray, sample_rate: int):
+        audio = np.asarray(audio, dtype=np.float32)
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        temp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+        sf.write(temp_path, audio, sample_rate, subtype="FLOAT", format="WAV")
+        os.replace(temp_path, path)
+        self._remember(key, audio, sample_rate)
+
+        with self._lock:
+            self._writes += 1
+            should_prune = self._writes % self.prune_every == 0
+        if should_prune:
+            self.prune()
+
+    def _remember(self, key: str, audio: np.ndarray, sample_rate: int):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return
+            self._memory[key] = (audio, sample_rate)
+            self._memory_bytes += audio.nbytes
+            while self._memory_bytes > self.max_memory_bytes and len(self._memory) > 1:
+                _, (evicted, _) = self._memory.popitem(last=False)
+                self._memory_bytes -= evicted.nbytes
+
+    def flush(self):
+        """Write batched memory-hit access times to the files' mtimes"""
+        with self._lock:
+            pending, self._pending_access = self._pending_access, {}
+        for key, accessed_at in pending.items():
+            path = self._path(key)
+            try:
+                if os.stat(path).st_mtime < accessed_at:
+                    os.utime(path, (accessed_at, accessed_at))
+            except FileNotFoundError:
+                pass
+
+    def prune(self):
+        """Delete least recently used files once the directory exceeds its byte budget"""
+        self.flush()
+        entries = []
+        total = 0
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith(".tmp"):
+                    continue  # being written; os.replace will publish it
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+        if total <= self.max_disk_bytes:
+            return
+
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        logger.info(f"Pruned {removed} sentence audio files from cache")
+
+    def stats(self):
+        return {
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_bytes
+        }
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Segmented Stream Packaging for AI Service
+HLS/DASH segments and playlists published while an episode is still rendering
+"""
+
+import os
+import re
+import time
+import shutil
+import logging
+import threading
+import subprocess
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_STREAM_ID = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+# protocol -> (playlist/manifest name, segment duration option, ffmpeg muxer arguments)
+PROTOCOLS = {
+    "hls": ("index.m3u8", "-hls_time", [
+        "-f", "hls", "-hls_playlist_type", "event", "-hls_segment_type", "mpegts",
+        "-hls_flags", "temp_file", "-hls_segment_filename", "segment_%05d.ts"
+    ]),
+    "dash": ("manifest.mpd", "-seg_duration", [
+        "-f", "dash", "-streaming", "1", "-use_template", "1", "-use_timeline", "1",
+        "-init_seg_name", "init.m4s", "-media_seg_name", "segment_$Number%05d$.m4s"
+    ]),
+}
+
+# AAC bitrate presets for segmented output (same preset names as the file renditions)
+AAC_BITRATES = {"low": "48k", "standard": "96k", "high": "128k"}
+
+MEDIA_TYPES = {
+    ".m3u8": "application/vnd.apple.mpegurl",
+    ".ts": "video/mp2t",
+    ".mpd": "application/dash+xml",
+    ".m4s": "video/iso.segment",
+}
+
+
+def is_valid_stream_id(stream_id: str) -> bool:
+    return bool(_STREAM_ID.match(stream_id))
+
+
+def validate_protocol(protocol: str, preset: str = "standard"):
+    if protocol not in PROTOCOLS:
+        raise ValueError(f"Unsupported stream protocol: {protocol} (expected one of {', '.join(PROTOCOLS)})")
+    if preset not in AAC_BITRATES:
+        raise ValueError(f"Unknown bitrate preset: {preset} (expected one of {', '.join(AAC_BITRATES)})")
+
+
+def stream_media_type(path: str) -> str:
+    return MEDIA_TYPES.get(os.path.splitext(path)[1], "application/octet-stream")
+
+
+def list_segments(stream_dir: str) -> List[str]:
+    """Published segments of a stream (ffmpeg's in-progress temp files excluded)"""
+    return sorted(name for name in os.listdir(stream_dir)
+                  if name.startswith("segment_") and not name.endswith(".tmp"))
+
+
+class SegmentWriter:
+    """One live stream: float32 blocks in, AAC segments and a growing playlist out.
+
+    A single ffmpeg process encodes the whole stream, so segment boundaries carry
+    no encoder priming gaps; its segmenter cuts a segment every ``segment_seconds``
+    of audio and rewrites the playlist as soon as the segment is complete.
+    ``write`` blocks while ffmpeg catches up, so call it off the event loop.
+    """
+
+    def __init__(self, packager: "StreamPackager", stream_id: str, stream_dir: str, sample_rate: int,
+                 protocol: str, preset: str):
+        self.packager = packager
+        self.stream_id = stream_id
+        self.stream_dir = stream_dir
+        self.sample_rate = sample_rate
+        self.protocol = protocol
+        self.playlist_name = PROTOCOLS[protocol][0]
+        self.frames_written = 0
+        self.started_at = time.time()
+
+        _, duration_option, muxer_args = PROTOCOLS[protocol]
+        command = [
+            packager.ffmpeg_path, "-v", "error", "-y",
+            "-f", "f32le", "-ar", str(sample_rate), "-ac", "1", "-i", "pipe:0",
+            "-c:a", "aac", "-b:a", AAC_BITRATES[preset],
+            *muxer_args, duration_option, str(packager.segment_seconds),
+            self.playlist_name
+        ]
+        # Relative segment names keep the playlist's URLs relative to its own directory
+        self._process = subprocess.Popen(
+            command, cwd=stream_dir, stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+        )
+
+    @property
+    def playlist_path(self) -> str:
+        return os.path.join(self.stream_dir, self.playlist_name)
+
+    def write(self, audio: np.ndarray):
+        """Append float32 mono audio to the stream (blocking)"""
+        if audio.dtype != np.float32:
+            audio = audio.astype(np.float32)
+        self._process.stdin.write(audio.tobytes())
+        self.frames_written += len(audio)
+
+    def close(self) -> str:
+        """Flush the last (short) segment and finalize the playlist; returns its path"""
+        _, stderr = self._process.communicate()
+        if self._process.returncode != 0:
+            self.packager._finished(self, failed=True)
+            raise RuntimeError(f"ffmpeg segmenter failed: {stderr.decode(errors='replace').strip()}")
+        self.packager._finished(self, failed=False)
+        logger.info(f"Packaged stream {self.stream_id}: {self.frames_written / self.sample_rate:.1f}s "
+                    f"in {len(list_segments(self.stream_dir))} {self.protocol} segments")
+        return self.playlist_path
+
+    def abort(self):
+        """Stop encoding and remove the partial stream"""
+        self._process.kill()
+        self._process.communicate()
+        shutil.rmtree(self.stream_dir, ignore_errors=True)
+        self.packager._finished(self, failed=True)
+
+
+class StreamPackager:
+    """Open segmented streams under ``<root_dir>/<stream_id>/``.
+
+    Listeners fetch the playlist (HLS ``index.m3u8`` or DASH ``manifest.mpd``)
+    and its segments while the producer is still writing: each segment appears,
+    complete, as soon as its time range has been rendered.
+    """
+
+    def __init__(self, root_dir: str, segment_seconds: float = 6.0, ffmpeg_path: Optional[str] = None):
+        self.root_dir = root_dir
+        self.segment_seconds = segment_seconds
+        self.ffmpeg_path = ffmpeg_path or shutil.which("ffmpeg")
+        self.streams_started = 0
+        self.streams_completed = 0
+        self.streams_failed = 0
+        self.total_audio_seconds = 0.0
+        self._active: Dict[str, SegmentWriter] = {}
+        self._lock = threading.Lock()
+        os.makedirs(root_dir, exist_ok=True)
+
+    @property
+    def available(self) -> bool:
+        return self.ffmpeg_path is not None
+
+    def stream_dir(self, stream_id: str) -> str:
+        return os.path.join(self.root_dir, stream_id)
+
+    def open(self, stream_id: str, sample_rate: int, protocol: str = "hls",
+             preset: str = "standard") -> SegmentWriter:
+        validate_protocol(protocol, preset)
+        if not is_valid_stream_id(stream_id):
+            raise ValueError(f"Invalid stream id: {stream_id}")
+        if not self.available:
+            raise RuntimeError("ffmpeg is not installed; segmented output is unavailable")
+
+        stream_dir = self.stream_dir(stream_id)
+        os.makedirs(stream_dir, exist_ok=True)
+        writer = SegmentWriter(self, stream_id, stream_dir, sample_rate, protocol, preset)
+        with self._lock:
+            self._active[stream_id] = writer
+            self.streams_started += 1
+        return writer
+
+    def is_live(self, stream_id: str) -> bool:
+        with self._lock:
+            return stream_id in self._active
+
+    def describe(self, stream_id: str) -> Optional[Dict[str, object]]:
+        """Protocol, state and published segment count of a stream; None if it does not exist"""
+        stream_dir = self.stream_dir(stream_id)
+        if not is_valid_stream_id(stream_id) or not os.path.isdir(stream_dir):
+            return None
+        with self._lock:
+            writer = self._active.get(stream_id)
+        if writer is not None:
+            protocol = writer.protocol
+        else:
+            protocol = next((name for name, (playlist, _, _) in PROTOCOLS.items()
+                             if os.path.exists(os.path.join(stream_dir, playlist))), None)
+        return {
+            "protocol": protocol,
+            "status": "live" if writer is not None else "complete",
+            "segments": len(list_segments(stream_dir))
+        }
+
+    def _finished(self, writer: SegmentWriter, failed: bool):
+        with self._lock:
+            if self._active.pop(writer.stream_id, None) is None:
+                return
+            if failed:
+                self.streams_failed += 1
+            else:
+                self.streams_completed += 1
+                self.total_audio_seconds += writer.frames_written / writer.sample_rate
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "ffmpeg_available": self.available,
+                "segment_seconds": self.segment_seconds,
+                "live_streams": len(self._active),
+                "streams_started": self.streams_started,
+                "streams_completed": self.streams_completed,
+                "streams_failed": self.streams_failed,
+                "audio_seconds_packaged": self.total_audio_seconds
+            }
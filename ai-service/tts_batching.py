@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Dynamic Micro-Batching for AI Service
+Collects TTS jobs from concurrent requests into small batches for the inference engine
+"""
+
+import time
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """Group concurrently submitted items into batches for ``batch_fn``.
+
+    A batch is dispatched when ``max_batch_size`` items are waiting or
+    ``window_ms`` has passed since the first one arrived, whichever comes first.
+    ``batch_fn`` receives a list of items and returns one awaitable per item; each
+    caller gets its own item's result (or error) as soon as that awaitable
+    settles, not when the whole batch is done.
+    """
+
+    def __init__(self, batch_fn: Callable[[List[Any]], List[Awaitable]],
+                 max_batch_size: int = 8, window_ms: float = 10.0, max_concurrent_batches: int = 2):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.window = window_ms / 1000.0
+        self.max_concurrent_batches = max_concurrent_batches
+
+        self.batches_dispatched = 0
+        self.items_dispatched = 0
+        self.total_queue_wait = 0.0
+        self.batch_size_counts = defaultdict(int)
+
+        self._queue: asyncio.Queue = None
+        self._slots: asyncio.Semaphore = None
+        self._runner: asyncio.Task = None
+
+    def start(self):
+        """Start the collector task on the running event loop"""
+        self._queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(self.max_concurrent_batches)
+        self._runner = asyncio.ensure_future(self._collect())
+
+    def stop(self):
+        if self._runner:
+            self._runner.cancel()
+            self._runner = None
+
+    async def submit(self, item: Any) -> Any:
+        """Queue one item and wait for its individual result"""
+        future = asyncio.get_event_loop().create_future()
+        await self._queue.put((item, future, time.time()))
+        return await future
+
+    async def _collect(self):
+        while True:
+            batch = [await self._queue.get()]
+            deadline = time.time() + self.window
+
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            # Wait for a free slot so batches keep growing while the engine is busy
+            await self._slots.acquire()
+            asyncio.ensure_future(self._dispatch(batch))
+
+    async def _dispatch(self, batch: List[Any]):
+        dispatched_at = time.time()
+        self.batches_dispatched += 1
+        self.items_dispatched += len(batch)
+        self.batch_size_counts[len(batch)] += 1
+        self.total_queue_wait += sum(dispatched_at - queued_at for _, _, queued_at in batch)
+
+        try:
+            try:
+                waiters = self.batch_fn([item for item, _, _ in batch])
+            except Exception as e:
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+            await asyncio.gather(*[self._deliver(waiter, future) for (_, future, _), waiter in zip(batch, waiters)])
+        finally:
+            self._slots.release()
+
+    @staticmethod
+    async def _deliver(waiter: Awaitable, future: asyncio.Future):
+        try:
+            result = await waiter
+        except Exception as e:
+            if not future.done():  # caller was cancelled
+                future.set_exception(e)
+        else:
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        batches = self.batches_dispatched
+        items = self.items_dispatched
+        return {
+            "max_batch_size": self.max_batch_size,
+            "window_ms": self.window * 1000.0,
+            "batches_dispatched": batches,
+            "items_dispatched": items,
+            "avg_batch_size": items / batches if batches else 0,
+            "avg_occupancy": items / (batches * self.max_batch_size) if batches else 0,
+            "avg_queue_wait_ms": self.total_queue_wait / items * 1000.0 if items else 0,
+            "batch_size_histogram": dict(sorted(self.batch_size_counts.items())),
+            "queued": self._queue.qsize() if self._queue else 0
+        }
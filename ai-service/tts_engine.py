@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+TTS Inference Engine for AI Service
+Process-pool Coqui inference with model-resident workers returning float32 PCM
+"""
+
+import os
+import time
+import queue
+import asyncio
+import logging
+import threading
+import itertools
+import multiprocessing as mp
+from typing import Awaitable, Dict, List, Optional, Tuple
+
+import numpy as np
+import torch
+from TTS.api import TTS
+
+from model_registry import model_registry
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTS_MODEL = "tts_models/en/ljspeech/tacotron2-DDC"
+
+
+# Layer types torch can quantize dynamically (weights int8, activations quantized on the fly)
+_QUANTIZABLE_LAYERS = {torch.nn.Linear, torch.nn.LSTM, torch.nn.LSTMCell, torch.nn.GRU, torch.nn.GRUCell}
+
+
+def optimize_for_cpu(tts):
+    """Apply dynamic int8 quantization to the eligible layers of a loaded Coqui model.
+
+    Convolutions (most of the HiFi-GAN vocoder) are not eligible for dynamic
+    quantization and stay fp32; the attention/decoder LSTMs and projections of
+    Tacotron2, where CPU time goes, are quantized in place.
+    """
+    synthesizer = tts.synthesizer
+    for attr in ("tts_model", "vocoder_model"):
+        module = getattr(synthesizer, attr, None)
+        if module is None:
+            continue
+        module.eval()
+        torch.quantization.quantize_dynamic(module, _QUANTIZABLE_LAYERS, dtype=torch.qint8, inplace=True)
+    return tts
+
+
+def model_key(model_name: str, fast_cpu: bool = False) -> str:
+    """Registry/cache key for a model and inference mode"""
+    return f"{model_name}#fast-cpu" if fast_cpu else model_name
+
+
+def get_tts_model(model_name: str = DEFAULT_TTS_MODEL, fast_cpu: bool = False):
+    """Load (once) and return a Coqui TTS model through the model registry"""
+    key = model_key(model_name, fast_cpu)
+    if fast_cpu:
+        loader = lambda: optimize_for_cpu(TTS(model_name))
+    else:
+        loader = lambda: TTS(model_name)
+    model_registry.register(key, loader, pinned=key == DEFAULT_TTS_MODEL)
+    return model_registry.get(key)
+
+
+def run_tts(model, text: str, speed: float = 1.0, fast_cpu: bool = False) -> np.ndarray:
+    """Synthesize with a loaded model; fast-CPU mode also disables autograd tracking entirely"""
+    if fast_cpu:
+        with torch.inference_mode():
+            wav = model.tts(text=text, speed=speed)
+    else:
+        wav = model.tts(text=text, speed=speed)
+    return np.asarray(wav, dtype=np.float32)
+
+
+def _worker_main(worker_id: int, model_name: str, torch_threads: int, interop_threads: int,
+                 preload_fast_cpu: bool, jobs, results, held):
+    """Worker process: load the model once, then serve sentence-batch jobs until told to stop"""
+    # Pin this worker's intra-op and inter-op pools so workers do not oversubscribe cores
+    torch.set_num_threads(torch_threads)
+    torch.set_num_interop_threads(interop_threads)
+
+    try:
+        model = get_tts_model(model_name)
+        sample_rate = model.synthesizer.output_sample_rate
+        if preload_fast_cpu:
+            get_tts_model(model_name, fast_cpu=True)
+    except Exception as e:
+        results.put(("failed", worker_id, str(e)))
+        return
+
+    results.put(("ready", worker_id, sample_rate))
+
+    while True:
+        job = jobs.get()
+        if job is None:
+            break
+
+        # Coqui's Synthesizer has no batched forward pass, so a batch runs its sentences
+        # back to back inside one job and each result is sent the moment it is done
+        job_id, items = job
+        # Shared memory rather than a queue message: it is visible to the parent even
+        # if this process is killed before its queue feeder thread flushes
+        held[worker_id] = job_id
+        for index, (text, speed, fast_cpu) in enumerate(items):
+            start_time = time.time()
+            try:
+                job_model = get_tts_model(model_name, fast_cpu=True) if fast_cpu else model
+                audio, error = run_tts(job_model, text, speed, fast_cpu), None
+            except Exception as e:
+                audio, error = None, str(e)
+            results.put(("result", job_id, index, audio, error, sample_rate, time.time() - start_time))
+        held[worker_id] = -1
+
+
+class TTSInferenceEngine:
+    """Dispatch sentence-level TTS jobs to N worker processes.
+
+    Each worker owns its own model instance and torch thread pool, so concurrent
+    requests scale with cores instead of contending on one model and the GIL.
+    Workers pull from one shared job queue, which load-balances for free. A job
+    carries a list of sentences so a micro-batch costs one queue round trip, yet
+    each sentence resolves as soon as its own synthesis finishes.
+
+    The dispatcher also watches worker liveness: a worker that dies after
+    loading (segfault, OOM kill) fails the job it was holding, counts as a
+    failed worker and is respawned. A worker that dies while loading is not
+    respawned, since its replacement would most likely fail the same way.
+    """
+
+    def __init__(self, model_name: str = DEFAULT_TTS_MODEL, num_workers: int = 2,
+                 torch_threads: int = 1, interop_threads: int = 1,
+                 preload_fast_cpu: bool = False, job_timeout: float = 300.0,
+                 liveness_interval: float = 1.0):
+        self.model_name = model_name
+        self.num_workers = num_workers
+        self.torch_threads = torch_threads
+        self.interop_threads = interop_threads
+        self.preload_fast_cpu = preload_fast_cpu
+        self.job_timeout = job_timeout
+        self.liveness_interval = liveness_interval
+        self.sample_rate = None
+        self.ready_workers = 0
+        self.failed_workers = 0
+        self.worker_restarts = 0
+        self.jobs_completed = 0
+        self.jobs_failed = 0
+        self.total_inference_time = 0.0
+        self.started_at = None
+
+        self._processes: Dict[int, mp.Process] = {}
+        self._ready = set()  # worker ids that loaded their model
+        self._load_failed = set()  # worker ids that could not load it; never respawned
+        self._held = None  # shared array: worker id -> job id it is synthesizing, -1 when idle
+        self._pending: Dict[int, List] = {}  # job id -> [loop, one future per sentence, sentences left]
+        self._job_ids = itertools.count()
+        self._dispatcher = None
+        self._stopping = False
+        self._ctx = None
+        self._jobs = None
+        self._results = None
+
+    @property
+    def available(self) -> bool:
+        return bool(self._processes) and len(self._load_failed) < self.num_workers
+
+    def start(self):
+        """Spawn the worker processes and the result dispatcher thread"""
+        self._ctx = mp.get_context("spawn")
+        self._jobs = self._ctx.Queue()
+        self._results = self._ctx.Queue()
+        self._held = self._ctx.Array("q", [-1] * self.num_workers, lock=False)
+        self.started_at = time.time()
+        self._stopping = False
+
+        for worker_id in range(self.num_workers):
+            self._spawn(worker_id)
+
+        self._dispatcher = threading.Thread(target=self._dispatch_results, name="tts-dispatcher", daemon=True)
+        self._dispatcher.start()
+        logger.info(f"Started TTS engine: {self.num_workers} workers x {self.torch_threads} torch threads "
+                    f"({self.interop_threads} inter-op)")
+
+    def _spawn(self, worker_id: int):
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(worker_id, self.model_name, self.torch_threads, self.interop_threads,
+                  self.preload_fast_cpu, self._jobs, self._results, self._held),
+            name=f"tts-worker-{worker_id}",
+            daemon=True
+        )
+        self._held[worker_id] = -1
+        process.start()
+        self._processes[worker_id] = process
+
+    def stop(self):
+        """Ask workers to exit and stop the dispatcher"""
+        self._stopping = True
+        processes = list(self._processes.values())
+        for _ in processes:
+            self._jobs.put(None)
+        for process in processes:
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+        self._processes = {}
+        if self._results is not None:
+            self._results.put(("stop",))
+        if self._dispatcher is not None:
+            self._dispatcher.join(timeout=10)
+            self._dispatcher = None
+        self._fail_pending("TTS engine stopped")
+
+    async def synthesize(self, text: str, speed: float = 1.0, fast_cpu: bool = False) -> Tuple[np.ndarray, int]:
+        """Synthesize one sentence on a worker; returns (float32 audio, sample_rate)"""
+        return await self.submit_batch([(text, speed, fast_cpu)])[0]
+
+    def submit_batch(self, items: List[Tuple[str, float, bool]]) -> List[Awaitable]:
+        """Queue a batch of (text, speed, fast_cpu) items across the workers.
+
+        The batch is cut into one contiguous shard per live worker so a full batch
+        still uses every core. Returns one awaitable per item, resolving to its
+        (audio, sample_rate) or raising its own error as soon as that item is done.
+        """
+        if not self.available:
+            raise RuntimeError("TTS engine is not running")
+
+        loop = asyncio.get_event_loop()
+        num_shards = min(len(items), max(1, len(self._ready)))
+        shard_size = -(-len(items) // num_shards)
+
+        waiters = []
+        for start in range(0, len(items), shard_size):
+            shard = items[start:start + shard_size]
+            futures = [loop.create_future() for _ in shard]
+            job_id = next(self._job_ids)
+            self._pending[job_id] = [loop, futures, len(shard)]
+            self._jobs.put((job_id, shard))
+            # An item waits behind the ones before it in its shard
+            waiters.extend(asyncio.wait_for(future, self.job_timeout * (position + 1))
+                           for position, future in enumerate(futures))
+        return waiters
+
+    def _dispatch_results(self):
+        last_check = time.time()
+        while True:
+            # Time out regularly so a dead worker is noticed even when no results arrive
+            try:
+                message = self._results.get(timeout=self.liveness_interval)
+            except queue.Empty:
+                message = None
+            if time.time() - last_check >= self.liveness_interval:
+                self._check_workers()
+                last_check = time.time()
+            if message is None:
+                continue
+            kind = message[0]
+
+            if kind == "stop":
+                break
+            elif kind == "ready":
+                _, worker_id, sample_rate = message
+                self._ready.add(worker_id)
+                self.ready_workers = len(self._ready)
+                self.sample_rate = sample_rate
+                logger.info(f"TTS worker {worker_id} ready ({sample_rate} Hz)")
+            elif kind == "failed":
+                _, worker_id, error = message
+                self._load_failed.add(worker_id)
+                self.failed_workers += 1
+                logger.error(f"TTS worker {worker_id} failed to load model: {error}")
+                if not self.available:
+                    self._fail_pending(f"All TTS workers failed to start: {error}")
+            elif kind == "result":
+                _, job_id, index, audio, error, sample_rate, inference_time = message
+                if error is None:
+                    self.jobs_completed += 1
+                    self.total_inference_time += inference_time
+                else:
+                    self.jobs_failed += 1
+
+                entry = self._pending.get(job_id)
+                if entry is None:
+                    continue  # the worker died and the job was already failed
+                loop, futures, _ = entry
+                entry[2] -= 1
+                if entry[2] == 0:
+                    del self._pending[job_id]
+                future = futures[index]  # resolving a timed-out or cancelled caller is a no-op
+                if error is None:
+                    loop.call_soon_threadsafe(self._resolve, future, (audio, sample_rate), None)
+                else:
+                    loop.call_soon_threadsafe(self._resolve, future, None, RuntimeError(error))
+
+    def _check_workers(self):
+        """Fail the job of every worker that died since the last check, and respawn it"""
+        if self._stopping:
+            return
+        for worker_id, process in list(self._processes.items()):
+            if process.is_alive() or worker_id in self._load_failed:
+                continue
+
+            job_id = self._held[worker_id]
+            entry = self._pending.pop(job_id, None) if job_id >= 0 else None
+            if entry is not None:
+                loop, futures, remaining = entry
+                error = RuntimeError(f"TTS worker {worker_id} died (exit code {process.exitcode})")
+                for future in futures:
+                    loop.call_soon_threadsafe(self._resolve, future, None, error)
+                self.jobs_failed += remaining
+
+            self.failed_workers += 1
+            if worker_id not in self._ready:
+                # Died while loading without reporting it: treat like a load failure
+                self._load_failed.add(worker_id)
+                logger.error(f"TTS worker {worker_id} died while loading (exit code {process.exitcode})")
+                if not self.available:
+                    self._fail_pending("All TTS workers failed to start")
+                continue
+
+            self._ready.discard(worker_id)
+            self.ready_workers = len(self._ready)
+            logger.error(f"TTS worker {worker_id} died (exit code {process.exitcode}); respawning")
+            self._spawn(worker_id)
+            self.worker_restarts += 1
+
+    @staticmethod
+    def _resolve(future: asyncio.Future, result, error: Optional[Exception]):
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def _fail_pending(self, reason: str):
+        for loop, futures, _ in list(self._pending.values()):
+            for future in futures:
+                loop.call_soon_threadsafe(self._resolve, future, None, RuntimeError(reason))
+
+    def stats(self) -> Dict[str, object]:
+        completed = self.jobs_completed
+        return {
+            "model": self.model_name,
+            "workers": self.num_workers,
+            "ready_workers": self.ready_workers,
+            "failed_workers": self.failed_workers,
+            "worker_restarts": self.worker_restarts,
+            "torch_threads_per_worker": self.torch_threads,
+            "interop_threads_per_worker": self.interop_threads,
+            "jobs_in_flight": sum(entry[2] for entry in list(self._pending.values())),
+            "jobs_completed": completed,
+            "jobs_failed": self.jobs_failed,
+            "avg_sentence_time": self.total_inference_time / completed if completed else 0
+        }
+
+
+def default_worker_count() -> int:
+    """Half the cores, at least one: leaves headroom for the event loop and audio DSP"""
+    return max(1, (os.cpu_count() or 2) // 2)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Voice Profile Store for AI Service
+Tortoise conditioning latents computed once per cloned voice and reused by voice id
+"""
+
+import os
+import re
+import glob
+import time
+import uuid
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+import torch
+from tortoise.utils.audio import load_audio
+
+logger = logging.getLogger(__name__)
+
+_VOICE_ID = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+# Sample rate Tortoise expects for conditioning clips
+_CONDITIONING_SAMPLE_RATE = 22050
+_SAMPLE_EXTENSIONS = ("*.wav", "*.mp3", "*.flac", "*.ogg")
+
+
+def is_valid_voice_id(voice_id: str) -> bool:
+    return bool(_VOICE_ID.match(voice_id))
+
+
+class VoiceProfileStore:
+    """Persist conditioning latents so repeat synthesis skips sample loading and embedding.
+
+    Uploaded samples live in ``voices/<voice_id>/``; the latents computed from them
+    are saved to ``<profiles_dir>/<voice_id>.pth`` and kept in memory once loaded.
+    """
+
+    def __init__(self, voices_dir: str = "voices", profiles_dir: str = os.path.join("cache", "voice_profiles")):
+        self.voices_dir = voices_dir
+        self.profiles_dir = profiles_dir
+        self._memory: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        os.makedirs(voices_dir, exist_ok=True)
+        os.makedirs(profiles_dir, exist_ok=True)
+
+    def sample_dir(self, voice_id: str) -> str:
+        return os.path.join(self.voices_dir, voice_id)
+
+    def _profile_path(self, voice_id: str) -> str:
+        return os.path.join(self.profiles_dir, f"{voice_id}.pth")
+
+    def sample_paths(self, voice_id: str) -> List[str]:
+        paths = []
+        for pattern in _SAMPLE_EXTENSIONS:
+            paths.extend(glob.glob(os.path.join(self.sample_dir(voice_id), pattern)))
+        return sorted(paths)
+
+    def has_profile(self, voice_id: str) -> bool:
+        with self._lock:
+            if voice_id in self._memory:
+                return True
+        return os.path.exists(self._profile_path(voice_id))
+
+    def get(self, voice_id: str) -> Optional[Any]:
+        """Return cached conditioning latents for ``voice_id`` or None"""
+        with self._lock:
+            latents = self._memory.get(voice_id)
+        if latents is not None:
+            return latents
+
+        path = self._profile_path(voice_id)
+        if not os.path.exists(path):
+            return None
+
+        latents = torch.load(path, map_location="cpu")
+        with self._lock:
+            self._memory[voice_id] = latents
+        return latents
+
+    def compute(self, tortoise_tts, voice_id: str) -> Any:
+        """Embed the uploaded samples once and persist the latents (blocking)"""
+        paths = self.sample_paths(voice_id)
+        if not paths:
+            raise ValueError(f"No voice samples found for voice '{voice_id}'")
+
+        start_time = time.time()
+        samples = [load_audio(path, _CONDITIONING_SAMPLE_RATE) for path in paths]
+        latents = tortoise_tts.get_conditioning_latents(samples)
+
+        # Write then rename so other workers never read a partial file
+        path = self._profile_path(voice_id)
+        temp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+        torch.save(latents, temp_path)
+        os.replace(temp_path, path)
+
+        with self._lock:
+            self._memory[voice_id] = latents
+        logger.info(f"Computed voice profile '{voice_id}' from {len(paths)} samples in {time.time() - start_time:.1f}s")
+        return latents
+
+    def get_or_compute(self, tortoise_tts, voice_id: str) -> Any:
+        latents = self.get(voice_id)
+        if latents is None:
+            latents = self.compute(tortoise_tts, voice_id)
+        return latents
+
+    def list_profiles(self) -> List[Dict[str, Any]]:
+        profiles = []
+        for path in sorted(glob.glob(os.path.join(self.profiles_dir, "*.pth"))):
+            voice_id = os.path.splitext(os.path.basename(path))[0]
+            profiles.append({
+                "voice_id": voice_id,
+                "samples": len(self.sample_paths(voice_id)),
+                "created_at": os.path.getmtime(path)
+            })
+        return profiles